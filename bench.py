@@ -0,0 +1,407 @@
+# file: bench.py
+"""
+Offline benchmarks for bot.py against fake_discord.FakeDiscord (no token, no network).
+
+    python bench.py                         # 10 / 100 / 1000 monitored channels
+    python bench.py --sizes 10,100 --latency 0.02 --rate-limit-every 50
+
+Reports, per size:
+  scan        channels scanned/sec and API calls per guild scan (history() polling, cached
+              last_message_id snowflakes, gateway MESSAGE_CREATE tracking)
+  countdown   API calls spent on the remaining-time message (ticker vs relative timestamp)
+  alerts      delay between a channel going over THRESHOLD_SECONDS and its alert being sent
+              (check_loop interval sweep vs deadline scheduler)
+  startup     on_ready -> every monitor scanned once (sequential legacy warm-up vs FAST_STARTUP)
+and once: do_masscreate channels/sec (plain and with +monitor enrollment).
+State files are written into a temporary directory; nothing in the working tree is touched.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+import bot as botmod
+from fake_discord import FakeDiscord
+
+
+TUNABLES = ("EVENT_DRIVEN_TRACKING", "SCAN_MODE", "COUNTDOWN_MODE", "THRESHOLD_SECONDS", "CHECK_INTERVAL_SECONDS",
+            "FAST_STARTUP", "SNOWFLAKE_ACTIVITY", "ALERT_DIGEST_THRESHOLD", "ALERT_UPDATE_MODE", "ALERT_REPING_EVERY")
+DEFAULTS = {name: getattr(botmod, name) for name in TUNABLES}
+
+
+async def reset_bot_state():
+    """Forget everything a previous scenario left in bot.py's module state (tunables back to their defaults)."""
+    for name, value in DEFAULTS.items():
+        setattr(botmod, name, value)
+    botmod.deadline_scheduler.clear()
+    tasks = [task for task in (botmod.scheduler_task, botmod.timer_task, botmod.deletion_task, *botmod.guild_scan_tasks.values())
+             if task is not None and not task.done()]
+    for task in tasks:
+        task.cancel()
+    # wait for them to finish, so no scheduler of an earlier scenario keeps running
+    await asyncio.gather(*tasks, return_exceptions=True)
+    botmod.scheduler_task = None
+    botmod.timer_task = None
+    botmod.deletion_task = None
+    if botmod.check_loop.is_running():
+        botmod.check_loop.cancel()
+    botmod.monitored.clear()
+    botmod.config.clear()
+    botmod.config.update({"ui_channel_id": None, "guilds": {}, "scan_interval": botmod.CHECK_INTERVAL_SECONDS})
+    botmod.rebuild_guild_index()
+    botmod.ready_initialized = False
+    botmod.alert_dispatcher = botmod.AlertDispatcher()
+    botmod.deletion_scheduler = botmod.DeletionScheduler()
+    botmod.bulk_jobs = botmod.BulkJobQueue()
+    for store in (botmod.preserved_alerts, botmod.activity_known, botmod.seen_message_ids, botmod.scan_stats, botmod.remaining_cache,
+                  botmod.remaining_msg_handles, botmod.channel_cache, botmod.channel_misses, botmod.log_channel_locks,
+                  botmod.guild_scan_semaphores, botmod.list_name_keys, botmod.monitor_list_gens,
+                  botmod.alert_message_refs):
+        store.clear()
+    for key in botmod.perf_counters:
+        botmod.perf_counters[key] = 0
+    botmod.guild_scan_tasks.clear()
+    botmod.guild_next_check.clear()
+
+
+def setup_guild(fake: FakeDiscord, n: int, *, last_message_age=lambda i: 10.0, cached_last_id: bool = True):
+    """
+    Guild with n monitored channels, each with one message last_message_age(i) seconds old. cached_last_id=False
+    leaves the gateway cache without last_message_id, so the last message is only known through history().
+    """
+    gid, cids, log_id = fake.add_guild(n)
+    now = datetime.now(timezone.utc)
+    ent = botmod.ensure_guild_entry(gid)
+    ent["log_channel_id"] = log_id
+    for i, cid in enumerate(cids):
+        botmod.add_guild_monitored(gid, cid)
+        mid = fake.post_message(cid, at=now - timedelta(seconds=last_message_age(i)), dispatch=False)
+        if cached_last_id:
+            # as if the message predates the gateway session: it is in the GUILD_CREATE channel payload
+            botmod.bot.get_channel(cid).last_message_id = mid
+        botmod.monitored[cid] = botmod.MonitorRecord()
+    return gid, cids, log_id
+
+
+def new_fake(args):
+    return FakeDiscord(botmod.bot, latency=args.latency, jitter=args.jitter,
+                       rate_limit_every=args.rate_limit_every, retry_after=args.retry_after).install()
+
+
+def summarize(values):
+    if not values:
+        return "n/a"
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return f"mean {statistics.mean(ordered):.2f}s  p95 {p95:.2f}s  max {ordered[-1]:.2f}s"
+
+
+# ---------------- scenarios ----------------
+async def bench_scan(args, n: int, event_driven: bool, snowflake: bool):
+    await reset_bot_state()
+    botmod.EVENT_DRIVEN_TRACKING = event_driven
+    botmod.SNOWFLAKE_ACTIVITY = snowflake
+    fake = new_fake(args)
+    gid, cids, _ = setup_guild(fake, n)
+    guild = botmod.bot.get_guild(gid)
+    await botmod.perform_scan_for_guild(guild)   # warm-up: resolves channels, first history() per channel
+    fake.reset_counters()
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        await botmod.perform_scan_for_guild(guild)
+    elapsed = time.perf_counter() - started
+    return {
+        "scans_per_sec": n * args.rounds / elapsed if elapsed else float("inf"),
+        "calls_per_scan": fake.total_calls() / args.rounds,
+        "rate_limited": fake.rate_limited,
+    }
+
+
+async def bench_countdown(args, mode: str):
+    await reset_bot_state()
+    botmod.COUNTDOWN_MODE = mode
+    fake = new_fake(args)
+    gid, _, _ = setup_guild(fake, 1)
+    await botmod.ensure_remaining_message_for_guild(gid)
+    fake.reset_counters()
+
+    async def scan_cycles():
+        # stand-in for the scanner: a new next check time every --cycle seconds
+        while True:
+            botmod.guild_next_check[gid] = datetime.now(timezone.utc) + timedelta(seconds=args.cycle)
+            await asyncio.sleep(args.cycle)
+
+    driver = asyncio.create_task(scan_cycles())
+    updater = asyncio.create_task(botmod.update_remaining_messages_loop())
+    await asyncio.sleep(args.countdown_seconds)
+    for task in (driver, updater):
+        task.cancel()
+    await asyncio.gather(driver, updater, return_exceptions=True)
+    return {"calls": fake.total_calls(), "edits": botmod.perf_counters["remaining_edits"]}
+
+
+async def bench_alerts(args, n: int, scan_mode: str):
+    await reset_bot_state()
+    botmod.EVENT_DRIVEN_TRACKING = True
+    botmod.SCAN_MODE = scan_mode
+    botmod.THRESHOLD_SECONDS = args.threshold
+    botmod.CHECK_INTERVAL_SECONDS = args.interval
+    fake = new_fake(args)
+    rng = random.Random(n)
+    gid, cids, log_id = setup_guild(fake, n, last_message_age=lambda i: rng.uniform(0, args.threshold))
+    names = {botmod.bot.get_channel(cid).name: cid for cid in cids}
+    # the moment each channel crosses the threshold (its last message is the newest snowflake)
+    due = {cid: discord.utils.snowflake_time(max(fake.messages[cid])).timestamp() + args.threshold for cid in cids}
+    fake.reset_counters()
+
+    if scan_mode == "deadline":
+        botmod.rebuild_schedule()
+        runner = asyncio.create_task(botmod.deadline_scheduler.run())
+    else:
+        botmod.check_loop.start()
+        runner = None
+    # alerts for one guild serialize on its log channel, so give larger guilds time to drain their sends
+    deadline = time.time() + args.threshold + args.interval + args.settle + n * 3 * (args.latency + args.jitter)
+    while time.time() < deadline and sum(1 for r in botmod.monitored.values() if r.alert_message_id) < n:
+        await asyncio.sleep(0.1)
+    if runner is not None:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    else:
+        botmod.check_loop.cancel()
+
+    first_alert = {}
+    for sent_at, cid, data in fake.sent_log:
+        if cid != log_id:
+            continue
+        for embed in data.get("embeds") or []:
+            # single alerts name the channel in the title, digests list one per description line
+            text = (embed.get("title") or "") + "\n" + (embed.get("description") or "")
+            for name in re.findall(r"\*\*([^*]+)\*\*", text):
+                target = names.get(name)
+                if target is not None and target not in first_alert:
+                    first_alert[target] = sent_at
+    delays = [max(0.0, first_alert[cid] - due[cid]) for cid in first_alert]
+    return {"alerted": len(first_alert), "delays": delays, "calls": fake.total_calls(),
+            "messages": sum(1 for _, cid, _ in fake.sent_log if cid == log_id)}
+
+
+async def bench_repeat(args, n: int, update_mode: str):
+    """Every channel already has its own alert; measure --rounds rounds of repeat alerts."""
+    await reset_bot_state()
+    botmod.ALERT_UPDATE_MODE = update_mode
+    botmod.ALERT_REPING_EVERY = 0
+    botmod.ALERT_DIGEST_THRESHOLD = n + 1   # one alert message per channel, like a slow trickle of outages
+    botmod.THRESHOLD_SECONDS = args.threshold
+    fake = new_fake(args)
+    gid, cids, log_id = setup_guild(fake, n, last_message_age=lambda i: args.threshold * 10)
+    deleter = asyncio.create_task(botmod.deletion_scheduler.run())
+    limit = time.time() + args.settle + n * 3 * (args.latency + args.jitter)
+
+    async def alert_round():
+        now = datetime.now(timezone.utc)
+        await botmod.scan_channels_concurrently(gid, cids, now)
+        while time.time() < limit and any(botmod.monitored[cid].alert_sent_ts != int(now.timestamp()) for cid in cids):
+            await asyncio.sleep(0.05)
+
+    # warm-up: the first pass only picks up each channel's last activity, the second sends its first alert
+    await botmod.scan_channels_concurrently(gid, cids, datetime.now(timezone.utc))
+    await alert_round()
+    fake.reset_counters()
+    for _ in range(args.rounds):
+        limit = time.time() + args.settle + n * 3 * (args.latency + args.jitter)
+        for cid in cids:
+            # past the short double-alert guard of scan_monitored_channel
+            botmod.monitored[cid].alert_sent_ts -= 60
+        await alert_round()
+    # resend mode: wait for the superseded alerts to be bulk-deleted
+    while len(fake.messages.get(log_id, {})) > n and time.time() < limit + 5:
+        await asyncio.sleep(0.1)
+    deleter.cancel()
+    await asyncio.gather(deleter, return_exceptions=True)
+    return {"calls_per_alert": fake.total_calls() / (n * args.rounds),
+            "log_messages": len(fake.messages.get(log_id, {}))}
+
+
+async def bench_startup(args, n: int, fast: bool):
+    await reset_bot_state()
+    botmod.FAST_STARTUP = fast
+    fake = new_fake(args)
+    # no cached snowflakes: every channel's last message costs a history() call (with the fake's latency)
+    # in both modes, so this measures the startup order itself (sequential warm-up vs scanner first)
+    setup_guild(fake, n, cached_last_id=False)
+    # what a restart would find on disk
+    botmod.save_config()
+    botmod.save_monitored()
+    await botmod.persistence.flush()
+    # what __main__ does before bot.run()
+    botmod.load_config()
+    botmod.load_monitored()
+    botmod.load_pending_deletions()
+    fake.reset_counters()
+    started = time.perf_counter()
+    await botmod.on_ready()
+    limit = started + 30 + n * 2 * (args.latency + args.jitter)
+    while botmod.startup_stats["time_to_first_scan"] is None and time.perf_counter() < limit:
+        await asyncio.sleep(0.05)
+    on_ready = botmod.startup_stats["time_to_first_scan"]
+    # let the background countdown warm-up finish before the next scenario
+    while botmod.timer_task is None and time.perf_counter() < limit:
+        await asyncio.sleep(0.05)
+    return {"first_scan": on_ready, "calls": fake.total_calls()}
+
+
+async def bench_list(args, n: int, mode: str):
+    """
+    Page through the monitor list (100 per page) in every sort order, twice. "uncached" drops all caches per
+    render; "traffic" records a new message in this guild and in another one before every render.
+    """
+    await reset_bot_state()
+    fake = new_fake(args)
+    gid, cids, _ = setup_guild(fake, n)
+    _, other_cids, _ = setup_guild(fake, 10)
+    view = botmod.ListMonitorsView(botmod.bot.get_guild(gid), None, page_size=100)
+    renders = 0
+    started = time.perf_counter()
+    for _ in range(2):
+        for sort, _label in view.SORT_OPTIONS:
+            view.sort = sort
+            view._apply_sort()
+            for page in range(1, view.total_pages() + 1):
+                if mode == "uncached":
+                    botmod.list_name_keys.clear()
+                    botmod.touch_monitor_list(gid)
+                elif mode == "traffic":
+                    for cid in (cids[renders % n], other_cids[renders % 10]):
+                        botmod.monitored[cid].last_message_ts += 1
+                        botmod.save_monitored(cid)
+                view.page = page
+                view.build_embed()
+                renders += 1
+    view.stop()
+    return {"ms_per_page": (time.perf_counter() - started) * 1000 / renders, "pages": renders}
+
+
+async def bench_masscreate(args, monitor: bool):
+    await reset_bot_state()
+    fake = new_fake(args)
+    gid, _, log_id = fake.add_guild(0)
+    guild = botmod.bot.get_guild(gid)
+
+    class Author:
+        id = 0
+
+        def __str__(self):
+            return "bench"
+
+        async def send(self, *a, **kw):
+            return None
+
+    before = len(fake.channels)
+    started = time.perf_counter()
+    # progress goes to one status message in the log channel, like !masscreate in a channel
+    await botmod.do_masscreate(guild, botmod.bot.get_channel(log_id), "bench", args.masscreate, "text", 1, 0, None, Author(),
+                               monitor=monitor)
+    await botmod.bulk_jobs.wait(gid)
+    elapsed = time.perf_counter() - started
+    await botmod.persistence.flush()
+    created = len(fake.channels) - before
+    status_edits = fake.calls["PATCH /channels/{channel_id}/messages/{message_id}"]
+    return {"created": created, "per_sec": created / elapsed if elapsed else float("inf"), "calls": fake.total_calls(),
+            "status_edits": status_edits, "monitored": len(botmod.guild_monitored_list(gid))}
+
+
+# ---------------- driver ----------------
+async def main(args):
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    lines = [f"latency={args.latency}s jitter={args.jitter}s rate_limit_every={args.rate_limit_every}"]
+
+    def report(line=""):
+        lines.append(line)
+        print(line, flush=True)
+
+    report(lines[0])
+    for n in sizes:
+        report(f"\n=== {n} monitored channel(s) ===")
+        for label, event_driven, snowflake in (("history", False, False), ("snowflake", False, True), ("event", True, True)):
+            with quiet:
+                r = await bench_scan(args, n, event_driven, snowflake)
+            report(f"scan {label:9} {r['scans_per_sec']:10.1f} channels/s   {r['calls_per_scan']:8.1f} API calls/scan"
+                   f"   429s={r['rate_limited']}")
+        for scan_mode in ("interval", "deadline"):
+            with quiet:
+                r = await bench_alerts(args, n, scan_mode)
+            report(f"alerts {scan_mode:8}  {r['alerted']:5d}/{n} alerted   delay {summarize(r['delays'])}"
+                   f"   messages={r['messages']}   API calls={r['calls']}")
+        for update_mode in ("resend", "edit"):
+            with quiet:
+                r = await bench_repeat(args, n, update_mode)
+            report(f"repeat {update_mode:8}  {r['calls_per_alert']:5.2f} API calls/repeat alert"
+                   f"   messages left in log channel={r['log_messages']}")
+        for label, fast in (("legacy", False), ("fast", True)):
+            with quiet:
+                r = await bench_startup(args, n, fast)
+            first = f"{r['first_scan']:.2f}s" if r["first_scan"] is not None else "n/a"
+            report(f"startup {label:7}  time to first scan {first}   API calls={r['calls']}")
+        for mode in ("uncached", "cached", "traffic"):
+            with quiet:
+                r = await bench_list(args, n, mode)
+            report(f"list {mode:9} {r['ms_per_page']:8.3f} ms/page view   ({r['pages']} page views, 100/page, all sorts x2)")
+    if not args.skip_countdown:
+        report(f"\n=== countdown over {args.countdown_seconds:.0f}s (scan cycle {args.cycle:.0f}s) ===")
+        for mode in ("ticker", "relative"):
+            with quiet:
+                r = await bench_countdown(args, mode)
+            report(f"countdown {mode:8}  {r['edits']:4d} edits   {r['calls']:4d} API calls")
+    if args.masscreate:
+        report(f"\n=== masscreate {args.masscreate} channel(s) ===")
+        for label, monitor in (("plain", False), ("+monitor", True)):
+            with quiet:
+                r = await bench_masscreate(args, monitor)
+            report(f"masscreate {label:8}  {r['created']} created   {r['per_sec']:.2f} channels/s   monitored={r['monitored']}"
+                   f"   API calls={r['calls']} (status message edits={r['status_edits']})")
+
+    await reset_bot_state()
+    await botmod.persistence.flush()
+    return lines
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Offline benchmarks for the channel monitor bot")
+    p.add_argument("--sizes", default="10,100,1000", help="comma separated monitored channel counts")
+    p.add_argument("--latency", type=float, default=0.01, help="simulated seconds per API request")
+    p.add_argument("--jitter", type=float, default=0.0, help="extra uniform random latency per request")
+    p.add_argument("--rate-limit-every", type=int, default=0, help="inject a 429 every N requests (0 = off)")
+    p.add_argument("--retry-after", type=float, default=0.05, help="retry_after of injected 429s")
+    p.add_argument("--rounds", type=int, default=3, help="measured scans per size (after one warm-up scan)")
+    p.add_argument("--threshold", type=int, default=3, help="THRESHOLD_SECONDS used by the alert benchmark")
+    p.add_argument("--interval", type=int, default=4, help="CHECK_INTERVAL_SECONDS used by the alert benchmark")
+    p.add_argument("--settle", type=float, default=2.0, help="extra seconds to let alert sends drain")
+    p.add_argument("--countdown-seconds", type=float, default=20.0)
+    p.add_argument("--cycle", type=float, default=15.0, help="simulated scan cycle for the countdown benchmark")
+    p.add_argument("--skip-countdown", action="store_true")
+    p.add_argument("--masscreate", type=int, default=10, help="channels created by the masscreate benchmark (0 = skip)")
+    p.add_argument("--output", default=None, help="also write the report to this file")
+    p.add_argument("--verbose", action="store_true", help="keep the bot's own prints")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        lines = asyncio.run(main(args))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
@@ -2,9 +2,15 @@
 import os
 import json
 import asyncio
+import fnmatch
+import heapq
+import itertools
 import re
+import sqlite3
+import time
 from datetime import datetime, timezone, timedelta
 from zoneinfo import ZoneInfo
+import aiohttp
 import discord
 from discord.ext import tasks, commands
 
@@ -13,6 +19,14 @@ from discord.ext import tasks, commands
 TOKEN = os.getenv("DISCORD_TOKEN")
 BOT_GUILD_ID = os.getenv("BOT_GUILD_ID")
 MONITORED_FILE = "monitored.json"
+MONITORED_JOURNAL_FILE = "monitored.journal"   # append-only per-channel deltas on top of MONITORED_FILE
+PENDING_DELETIONS_FILE = "pending_deletions.json"  # scheduled message deletions, replayed on restart
+MONITORED_JOURNAL_COMPACT_EVERY = 500          # fold the journal into a fresh snapshot after this many entries
+PERSIST_DEBOUNCE_SECONDS = 1.0                 # coalesce config/monitor writes within this window
+# Storage backend for monitors and guild config: "json" (files above) or "sqlite" (WAL-mode database,
+# row-level updates). The first sqlite start migrates the existing JSON files once (they are left in place).
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+SQLITE_FILE = "monitor.db"
 CONFIG_FILE = "config.json"
 MONITORED_IMAGE_PATH = "/mnt/data/93b3f5bc-2247-4f67-a02f-7eb4209abc2c.png"
 
@@ -21,13 +35,78 @@ THRESHOLD_SECONDS = 300
 
 # Default scanning interval (how often the bot scans). Can be changed with /st.
 CHECK_INTERVAL_SECONDS = 180
+# Both are defaults: a guild (and a single channel) can override them with /schedule, see
+# guild_scan_interval() / monitor_threshold(). Every guild then scans on its own timeline.
 
 AUTO_DELETE_SECONDS = 300          # non-alert bot messages in log channels will be auto-deleted
+DELETION_BATCH_WINDOW_SECONDS = 1.0   # deletions due within this window are taken together (one bulk-delete per channel)
+BULK_DELETE_MAX_AGE_SECONDS = 14 * 24 * 3600 - 600   # Discord only bulk-deletes messages younger than 14 days
 UI_TEMP_DELETE_SECONDS = 10
 LOCAL_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
 
+# Channel resolver caches (see resolve_channel): channels fetched over REST are reused for
+# CHANNEL_CACHE_TTL_SECONDS; NotFound/Forbidden answers are remembered for CHANNEL_NEGATIVE_TTL_SECONDS
+# so a deleted channel costs one request, not one per loop iteration.
+CHANNEL_CACHE_TTL_SECONDS = 600
+CHANNEL_NEGATIVE_TTL_SECONDS = 300
+
 PING_EVERYONE = True
 PING_ROLE_IDS = []
+
+# Alert dispatcher: alerts for one log channel raised within ALERT_BATCH_WINDOW_SECONDS are sent together.
+# Fewer than ALERT_DIGEST_THRESHOLD of them go out as individual alerts; a burst of ALERT_DIGEST_THRESHOLD or
+# more becomes digest messages (one embed + Confirm select per ALERT_DIGEST_MAX_CHANNELS channels — 25 is Discord's select option limit).
+ALERT_BATCH_WINDOW_SECONDS = 1.0
+ALERT_DIGEST_THRESHOLD = 3
+ALERT_DIGEST_MAX_CHANNELS = 25
+# Repeat alerts: "edit" updates a channel's own alert message in place (Delay / Thông báo lần, one PATCH);
+# "resend" posts a new alert and deletes the old one. Edits don't notify anyone, so every
+# ALERT_REPING_EVERY-th alert (0 = never) is still re-sent with a fresh ping.
+ALERT_UPDATE_MODE = "edit"
+ALERT_REPING_EVERY = 3
+
+# Track channel activity from gateway MESSAGE_CREATE events (on_message) instead of calling
+# history(limit=1) for every monitored channel on every scan. Channels whose state is unknown
+# (startup, new gateway session) still fall back to history() once.
+EVENT_DRIVEN_TRACKING = True
+# Derive last activity from the gateway-cached channel.last_message_id snowflake (it encodes its creation
+# time) instead of history(limit=1); history() is only used when the channel isn't cached or has no id.
+SNOWFLAKE_ACTIVITY = True
+
+# "deadline": a min-heap of per-channel deadlines (last_message_time + THRESHOLD_SECONDS, or the
+# repeat-alert time) — the scanner sleeps until the earliest one and only evaluates channels that are due.
+# "interval": classic full sweep of every channel of a guild every guild_scan_interval() seconds (check_loop);
+# channels with their own scan_interval override are swept on their own interval instead.
+SCAN_MODE = "deadline"
+
+# Concurrent scanning: channels are evaluated in parallel, bounded per guild and across all guilds.
+# Sends/deletes into the same log channel share one Discord rate-limit bucket, so those are still
+# serialized per log channel. Set both to 1 for the old fully serial behaviour.
+SCAN_CONCURRENCY_PER_GUILD = 8
+SCAN_CONCURRENCY_GLOBAL = 32
+
+# Countdown message rendering: "relative" shows the next scan as a Discord <t:...:R> timestamp that the
+# client counts down locally, so the message is only edited when the guild's next check actually changes;
+# "ticker" re-renders the MM:SS value on a throttled per-second loop.
+COUNTDOWN_MODE = "relative"
+COUNTDOWN_MIN_EDIT_SECONDS = 5     # relative mode: never edit one guild's countdown more often than this
+
+# Startup: with FAST_STARTUP the scanner starts straight from persisted state and the first scan (bounded
+# by SCAN_CONCURRENCY_*) doubles as channel warm-up; remaining-time messages (WARMUP_CONCURRENCY guilds at
+# a time) and the command sync run in the background. False = old sequential on_ready.
+FAST_STARTUP = True
+WARMUP_CONCURRENCY = 4
+
+# Bulk channel jobs (masscreate, !bulk ...): items run back to back, paced by the rate-limit headers Discord
+# returns (no fixed sleeps). Transient failures (5xx, network, 429 beyond discord.py's own wait) are retried up
+# to BULK_MAX_RETRIES times, waiting BULK_BACKOFF_SECONDS, then twice as long per attempt. A job's status
+# message is edited at most every BULK_STATUS_EDIT_SECONDS.
+BULK_MAX_RETRIES = 4
+BULK_BACKOFF_SECONDS = 1.0
+BULK_STATUS_EDIT_SECONDS = 5
+# Before a create request the job records (and writes out) that items up to BULK_INFLIGHT_AHEAD ahead may have
+# been sent; a resumed job looks for an existing channel for every such item instead of creating it again.
+BULK_INFLIGHT_AHEAD = 16
 # ---------------------------------------------------
 
 intents = discord.Intents.default()
@@ -35,27 +114,117 @@ intents.messages = True
 intents.message_content = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+
+class RateLimitObserver:
+    """
+    aiohttp trace hook (passed to the bot as http_trace): remembers the rate-limit headers of the last
+    response per "METHOD /path", so bulk operations can wait for their bucket instead of sleeping blindly.
+    """
+
+    def __init__(self):
+        self.buckets = {}   # "POST /guilds/123/channels" -> (remaining, monotonic time the bucket resets)
+        self.hits_429 = 0
+
+    def trace_config(self):
+        trace = aiohttp.TraceConfig()
+        trace.on_request_end.append(self._on_request_end)
+        return trace
+
+    @staticmethod
+    def key(method: str, path: str):
+        return method.upper() + " " + re.sub(r"^/api/v\d+", "", path)
+
+    async def _on_request_end(self, session, ctx, params):
+        headers = params.response.headers
+        key = self.key(params.method, params.url.path)
+        now = time.monotonic()
+        try:
+            if params.response.status == 429:
+                self.hits_429 += 1
+                self.buckets[key] = (0, now + float(headers.get("Retry-After") or 1))
+            elif headers.get("X-RateLimit-Remaining") is not None:
+                self.buckets[key] = (int(headers["X-RateLimit-Remaining"]),
+                                     now + float(headers.get("X-RateLimit-Reset-After") or 0))
+        except (TypeError, ValueError):
+            pass
+
+    def delay(self, method: str, path: str):
+        """Seconds until the bucket of this route has requests left (0 if it has, or nothing is known)."""
+        entry = self.buckets.get(self.key(method, path))
+        if not entry or entry[0] > 0:
+            return 0.0
+        return max(0.0, entry[1] - time.monotonic())
+
+
+rate_limits = RateLimitObserver()
+
+
+class MonitorBot(commands.Bot):
+    async def close(self):
+        # guaranteed flush of coalesced config/monitor writes before the loop goes away
+        try:
+            await persistence.flush()
+        except Exception as e:
+            print("Error flushing state on shutdown:", e)
+        await super().close()
+
+
+bot = MonitorBot(command_prefix="!", intents=intents, http_trace=rate_limits.trace_config())
 
 # In-memory structures
 monitored = {}           # channel_id -> record
 config = {}              # persisted per-guild config and global settings
-preserved_alerts = {}    # alerts preserved when monitor removed
+preserved_alerts = {}    # alerts preserved when monitor removed (set / drop through preserve_alert / drop_preserved_alert)
+alert_message_refs = {}  # alert message id -> monitors + preserved alerts pointing at it (digests are shared)
+guild_members = {}       # guild_id -> set of monitored channel ids (persisted as the guild entry's "monitored" list)
+monitor_guilds = {}      # channel_id -> guild_id (reverse of guild_members)
 guild_locks = {}         # guild_id -> asyncio.Lock() for race-safety
+activity_known = set()   # channel ids whose last_message_time is kept fresh by on_message
+seen_message_ids = {}    # channel id -> newest message id our state reflects (compared with channel.last_message_id on reconnect)
+monitor_list_gens = {}   # guild_id -> [membership/name changes, monitor state changes]; ListMonitorsView's cache check
+list_name_keys = {}      # channel id -> (name, name sort key, numeric sort key), recomputed when the name changes
+log_channel_locks = {}   # log channel id -> asyncio.Lock() (one rate-limit bucket per log channel)
+guild_scan_semaphores = {}  # guild_id -> asyncio.Semaphore(SCAN_CONCURRENCY_PER_GUILD), shared by every scan of that guild
+scan_semaphore = asyncio.Semaphore(max(1, SCAN_CONCURRENCY_GLOBAL))
+scan_stats = {}          # guild_id -> {"channels": n, "duration": seconds, "finished_at": datetime}
+startup_stats = {"ready_at": None, "pending": set(), "time_to_first_scan": None}
 
 # Timer utilities (for remaining-time)
-next_check_time = None   # datetime of next scheduled check_loop run
+guild_next_check = {}    # guild_id -> datetime of that guild's next scheduled scan
+channel_next_check = {}  # channel_id -> datetime of the next interval-mode scan of a channel with its own scan_interval
+guild_scan_tasks = {}    # guild_id -> asyncio.Task of the scan currently running for that guild
 timer_task = None        # asyncio.Task for the remaining-time updater
+scheduler_task = None    # asyncio.Task running deadline_scheduler.run() (SCAN_MODE == "deadline")
+deletion_task = None     # asyncio.Task running deletion_scheduler.run()
+ready_initialized = False  # on_ready has done the one-time initialization
 
 # Cache to avoid frequent edits (keyed by guild id)
-# Each value: {"last_str": "MM:SS", "last_update": datetime}
+# Each value: {"last_str": "MM:SS", "last_update": datetime, "last_sig": remaining_signature()}
 remaining_cache = {}
 
-# ---------------- Persistence helpers ----------------
-def iso_dt(dt):
-    return dt.astimezone(timezone.utc).isoformat() if dt else None
-
+# guild_id -> discord.PartialMessage of the remaining-time message, so edits go straight to PATCH
+# without a fetch_message GET first. Invalidated on 404 / on_raw_message_delete / id change.
+remaining_msg_handles = {}
+
+# Cheap counters surfaced by /perf
+perf_counters = {
+    "remaining_edits": 0,
+    "remaining_fetch_avoided": 0,
+    "remaining_handle_invalidations": 0,
+    "channel_fetches": 0,
+    "channel_negative_hits": 0,
+    "bulk_deletes": 0,
+    "single_deletes": 0,
+    "snowflake_lookups": 0,
+    "history_lookups": 0,
+    "channels_created": 0,
+    "bulk_retries": 0,
+}
+channel_cache = {}       # channel_id -> (channel, expires_ts) for channels obtained via fetch_channel()
+channel_misses = {}      # channel_id -> (expires_ts, exception) for NotFound / Forbidden
 
+# ---------------- Persistence helpers ----------------
 def from_iso(s):
     if not s:
         return None
@@ -68,56 +237,595 @@ def from_iso(s):
             return None
 
 
-def save_monitored():
-    try:
-        to_save = {}
-        for k, v in monitored.items():
-            to_save[str(k)] = {
-                "log_channel": v.get("log_channel"),
-                "last_message_time": iso_dt(v.get("last_message_time")),
-                "alert_count": v.get("alert_count", 0),
-                "alert_message_id": v.get("alert_message_id"),
-                "alert_sent_time": iso_dt(v.get("alert_sent_time")),
-                "confirmed": bool(v.get("confirmed", False)),
-                "confirmed_by": int(v.get("confirmed_by")) if v.get("confirmed_by") else None
-            }
-        with open(MONITORED_FILE, "w", encoding="utf-8") as f:
-            json.dump(to_save, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("Error saving monitored:", e)
+def to_ts(value):
+    """Epoch seconds (0 = unknown) from an int, a digit string (SQLite TEXT columns), an ISO string or a datetime."""
+    if not value:
+        return 0
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = str(value)
+    if value.isdigit():
+        return int(value)
+    dt = from_iso(value)
+    return int(dt.timestamp()) if dt else 0
+
+
+def ts_dt(ts: int):
+    return datetime.fromtimestamp(ts, timezone.utc) if ts else None
+
+
+class MonitorRecord:
+    """
+    State of one monitored channel. Times are epoch seconds (0 = unknown), so the scan compares ints;
+    last_message_time / alert_sent_time give datetimes for display.
+    """
+
+    __slots__ = ("log_channel", "last_message_ts", "alert_count", "_alert_message_id", "alert_sent_ts",
+                 "confirmed", "confirmed_by", "_counted")
+
+    def __init__(self, last_message_ts: int = 0, log_channel: int = None, alert_count: int = 0,
+                 alert_message_id: int = None, alert_sent_ts: int = 0, confirmed: bool = False, confirmed_by: int = None):
+        self._alert_message_id = None
+        self._counted = True
+        self.log_channel = log_channel
+        self.last_message_ts = last_message_ts
+        self.alert_count = alert_count
+        self.alert_message_id = alert_message_id
+        self.alert_sent_ts = alert_sent_ts
+        self.confirmed = confirmed
+        self.confirmed_by = confirmed_by
+
+    @property
+    def alert_message_id(self):
+        return self._alert_message_id
+
+    @alert_message_id.setter
+    def alert_message_id(self, message_id):
+        # keeps alert_message_refs current, so "is this alert shared?" is a dict lookup
+        if self._counted:
+            ref_alert_message(self._alert_message_id, -1)
+            ref_alert_message(message_id, 1)
+        self._alert_message_id = message_id
+
+    def detach(self):
+        """The record left `monitored`: its alert id stays readable but no longer counts as a reference."""
+        if self._counted:
+            ref_alert_message(self._alert_message_id, -1)
+            self._counted = False
+
+    @property
+    def last_message_time(self):
+        return ts_dt(self.last_message_ts)
+
+    @property
+    def alert_sent_time(self):
+        return ts_dt(self.alert_sent_ts)
+
+
+def ref_alert_message(message_id: int, delta: int):
+    if not message_id:
+        return
+    n = alert_message_refs.get(message_id, 0) + delta
+    if n > 0:
+        alert_message_refs[message_id] = n
+    else:
+        alert_message_refs.pop(message_id, None)
+
+
+def pop_monitor(cid: int):
+    """Remove a monitor record (detached from the alert refcount); None when it wasn't monitored."""
+    rec = monitored.pop(cid, None)
+    if rec is not None:
+        rec.detach()
+    return rec
+
+
+def preserve_alert(cid: int, log_channel: int, message_id: int, sent_time):
+    drop_preserved_alert(cid)
+    preserved_alerts[cid] = {"log_channel": log_channel, "alert_message_id": message_id, "alert_sent_time": sent_time}
+    ref_alert_message(message_id, 1)
+
+
+def drop_preserved_alert(cid: int):
+    p = preserved_alerts.pop(cid, None)
+    if p:
+        ref_alert_message(p.get("alert_message_id"), -1)
+
+
+def serialize_monitor(rec: MonitorRecord):
+    return {
+        "log_channel": rec.log_channel,
+        "last_message_time": rec.last_message_ts or None,
+        "alert_count": rec.alert_count,
+        "alert_message_id": rec.alert_message_id,
+        "alert_sent_time": rec.alert_sent_ts or None,
+        "confirmed": rec.confirmed,
+        "confirmed_by": rec.confirmed_by
+    }
+
+
+def deserialize_monitor(v: dict):
+    """Accepts both the epoch-int format and older files with ISO timestamps."""
+    return MonitorRecord(
+        log_channel=int(v["log_channel"]) if v.get("log_channel") else None,
+        last_message_ts=to_ts(v.get("last_message_time")),
+        alert_count=int(v.get("alert_count") or 0),
+        alert_message_id=int(v["alert_message_id"]) if v.get("alert_message_id") else None,
+        alert_sent_ts=to_ts(v.get("alert_sent_time")),
+        confirmed=bool(v.get("confirmed", False)),
+        confirmed_by=int(v["confirmed_by"]) if v.get("confirmed_by") else None
+    )
+
+
+def atomic_write_text(path: str, text: str):
+    """Write to a temp file, fsync, then rename over `path` so a crash never leaves a truncated file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def render_monitored_snapshot(gen: int):
+    data = {"_journal_gen": gen}
+    data.update({str(k): serialize_monitor(v) for k, v in monitored.items()})
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def render_monitor_deltas(cids, gen: int):
+    lines = []
+    for cid in cids:
+        rec = monitored.get(cid)
+        if rec is None:
+            lines.append(json.dumps({"op": "del", "gen": gen, "id": str(cid)}))
+        else:
+            lines.append(json.dumps({"op": "set", "gen": gen, "id": str(cid), "rec": serialize_monitor(rec)}, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+def write_monitored_snapshot(text: str):
+    atomic_write_text(MONITORED_FILE, text)
+    # journal lines carry the generation they apply to, so a crash right here only leaves stale lines
+    # that replay_monitored_journal() skips
+    with open(MONITORED_JOURNAL_FILE, "w", encoding="utf-8"):
+        pass
+
+
+def append_monitored_journal(text: str):
+    with open(MONITORED_JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class SqliteStore:
+    """
+    SQLite backend: one row per monitor, one row per guild entry, one row per (guild, channel) membership.
+    Writes run in the persistence executor (serialized by PersistenceService), hence check_same_thread=False.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS monitors (
+            channel_id INTEGER PRIMARY KEY,
+            log_channel INTEGER,
+            last_message_time TEXT,
+            alert_count INTEGER NOT NULL DEFAULT 0,
+            alert_message_id INTEGER,
+            alert_sent_time TEXT,
+            confirmed INTEGER NOT NULL DEFAULT 0,
+            confirmed_by INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS guilds (
+            guild_id INTEGER PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS guild_monitors (
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, channel_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_guild_monitors_channel ON guild_monitors(channel_id);
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS pending_deletions (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            due_ts REAL NOT NULL,
+            monitor_cid INTEGER
+        );
+    """
+    MONITOR_COLUMNS = ("log_channel", "last_message_time", "alert_count", "alert_message_id",
+                       "alert_sent_time", "confirmed", "confirmed_by")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        # last persisted guild rows / memberships, used to write only the rows that changed
+        self.guild_rows = {}
+        self.members = {}
+
+    def get_setting(self, key: str):
+        row = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_monitors(self):
+        cols = ", ".join(self.MONITOR_COLUMNS)
+        data = {}
+        for row in self.conn.execute(f"SELECT channel_id, {cols} FROM monitors"):
+            data[str(row[0])] = dict(zip(self.MONITOR_COLUMNS, row[1:]))
+        return data
+
+    def load_config(self):
+        """Rebuild the config dict (None when the database holds no config yet)."""
+        settings = {k: json.loads(v) for k, v in self.conn.execute("SELECT key, value FROM settings")}
+        settings.pop("migrated_from_json", None)
+        guilds = {}
+        for gid, data in self.conn.execute("SELECT guild_id, data FROM guilds"):
+            ent = json.loads(data)
+            ent["monitored"] = []
+            guilds[str(gid)] = ent
+            self.guild_rows[gid] = data
+        for gid, cid in self.conn.execute("SELECT guild_id, channel_id FROM guild_monitors ORDER BY rowid"):
+            guilds.setdefault(str(gid), {"monitored": []})["monitored"].append(cid)
+            self.members.setdefault(gid, set()).add(cid)
+        if not settings and not guilds:
+            return None
+        settings["guilds"] = guilds
+        return settings
+
+    def render_config(self, cfg: dict):
+        """
+        Diff cfg against the last persisted state (event-loop side). Returns the row changes to write plus the
+        state they lead to, which write_config() only adopts once the transaction committed (a failed write is
+        retried with the next one).
+        """
+        settings = [(k, json.dumps(v, ensure_ascii=False)) for k, v in cfg.items() if k != "guilds"]
+        guild_rows, member_adds, member_removes = [], [], []
+        new_rows, new_members = {}, {}
+        for gid, ent in cfg.get("guilds", {}).items():
+            gid = int(gid)
+            data = json.dumps({k: v for k, v in ent.items() if k != "monitored"}, ensure_ascii=False, sort_keys=True)
+            if self.guild_rows.get(gid) != data:
+                guild_rows.append((gid, data))
+            new_rows[gid] = data
+            persisted = self.members.get(gid, set())
+            current = ent.get("monitored", [])
+            current_set = set(current)
+            member_adds.extend((gid, cid) for cid in current if cid not in persisted)
+            member_removes.extend((gid, cid) for cid in persisted - current_set)
+            new_members[gid] = current_set
+        # guild entries that are gone from cfg
+        guild_deletes = [(gid,) for gid in (set(self.guild_rows) | set(self.members)) - set(new_rows)]
+        return settings, guild_rows, member_adds, member_removes, guild_deletes, (new_rows, new_members)
+
+    def write_config(self, settings, guild_rows, member_adds, member_removes, guild_deletes, state):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", settings)
+            self.conn.executemany("INSERT OR REPLACE INTO guilds (guild_id, data) VALUES (?, ?)", guild_rows)
+            self.conn.executemany("DELETE FROM guilds WHERE guild_id = ?", guild_deletes)
+            self.conn.executemany("DELETE FROM guild_monitors WHERE guild_id = ?", guild_deletes)
+            self.conn.executemany("DELETE FROM guild_monitors WHERE guild_id = ? AND channel_id = ?", member_removes)
+            self.conn.executemany("INSERT OR IGNORE INTO guild_monitors (guild_id, channel_id) VALUES (?, ?)", member_adds)
+        self.guild_rows, self.members = state
+
+    def write_monitors(self, upserts, deletes):
+        """upserts: [(channel_id, serialized record)], deletes: [channel_id]."""
+        cols = ", ".join(self.MONITOR_COLUMNS)
+        marks = ", ".join("?" for _ in self.MONITOR_COLUMNS)
+        rows = [(cid, *(v.get(c) for c in self.MONITOR_COLUMNS)) for cid, v in upserts]
+        with self.conn:
+            self.conn.executemany(f"INSERT OR REPLACE INTO monitors (channel_id, {cols}) VALUES (?, {marks})", rows)
+            self.conn.executemany("DELETE FROM monitors WHERE channel_id = ?", [(cid,) for cid in deletes])
+
+    def load_pending_deletions(self):
+        return [list(row) for row in self.conn.execute(
+            "SELECT channel_id, message_id, due_ts, monitor_cid FROM pending_deletions")]
+
+    def write_pending_deletions(self, rows):
+        """rows: [[channel_id, message_id, due_ts, monitor_cid]] — the complete pending set."""
+        with self.conn:
+            self.conn.execute("DELETE FROM pending_deletions")
+            self.conn.executemany("INSERT OR REPLACE INTO pending_deletions (channel_id, message_id, due_ts, monitor_cid)"
+                                  " VALUES (?, ?, ?, ?)", rows)
+
+    def migrate_from_json(self):
+        """One-shot import of config.json / monitored.json (+ journal) into an empty database."""
+        if self.get_setting("migrated_from_json"):
+            return
+        has_rows = self.conn.execute("SELECT 1 FROM monitors LIMIT 1").fetchone() or \
+            self.conn.execute("SELECT 1 FROM guilds LIMIT 1").fetchone()
+        if not has_rows:
+            cfg = read_json_config()
+            mons = read_json_monitored()
+            if isinstance(cfg, dict):
+                self.write_config(*self.render_config(cfg))
+            if mons:
+                self.write_monitors([(int(k), v) for k, v in mons.items()], [])
+            dels = read_json_pending_deletions()
+            if dels:
+                self.write_pending_deletions(dels)
+            if cfg or mons:
+                print(f"Migrated {len(mons or {})} monitor(s) and config from JSON into {self.path}")
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('migrated_from_json', 'true')")
+
+
+sqlite_store = None
+
+
+def get_sqlite_store():
+    global sqlite_store
+    if sqlite_store is None:
+        sqlite_store = SqliteStore(SQLITE_FILE)
+        sqlite_store.migrate_from_json()
+    return sqlite_store
+
+
+class PersistenceService:
+    """
+    Dirty-flag persistence. save_config()/save_monitored() only mark state dirty; every mutation within
+    PERSIST_DEBOUNCE_SECONDS is coalesced into one write. Pending state is rendered on the event loop
+    (so the snapshot is consistent) and the file I/O runs in the default executor.
+    flush() / flush_sync() force pending writes out (shutdown).
+    """
+
+    def __init__(self):
+        self.config_dirty = False
+        self.monitors_dirty = set()
+        self.deletions_dirty = False
+        self.compact_requested = False
+        self.journal_entries = 0   # entries appended to MONITORED_JOURNAL_FILE since the last compaction
+        self.journal_gen = 0       # generation of the current MONITORED_FILE snapshot
+        self.writes = 0
+        self._task = None
+        self._lock = None
+
+    def mark_config(self):
+        self.config_dirty = True
+        self._schedule()
+
+    def mark_monitors(self, cids):
+        self.monitors_dirty.update(cids)
+        self._schedule()
+
+    def mark_compact(self):
+        self.compact_requested = True
+        self._schedule()
+
+    def mark_deletions(self):
+        self.deletions_dirty = True
+        self._schedule()
+
+    def _schedule(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no event loop (startup before bot.run / after shutdown) -> write synchronously
+            self.flush_sync()
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._flush_later())
+
+    def dirty(self):
+        return self.config_dirty or bool(self.monitors_dirty) or self.deletions_dirty or self.compact_requested
+
+    async def _flush_later(self):
+        # state marked dirty while a write is in flight finds this task still running (_schedule adds no
+        # new one), so keep going until a round leaves nothing behind
+        while self.dirty():
+            await asyncio.sleep(PERSIST_DEBOUNCE_SECONDS)
+            await self.flush()
+
+    def _take(self):
+        """
+        Render pending writes and clear the dirty flags. Returns [(redo, fn, *args)] to run off the loop;
+        redo says what to mark dirty again when that write fails (see _restore).
+        """
+        ops = []
+        if STORAGE_BACKEND == "sqlite":
+            store = get_sqlite_store()
+            if self.deletions_dirty:
+                self.deletions_dirty = False
+                ops.append((("deletions",), store.write_pending_deletions, deletion_scheduler.rows()))
+            if self.config_dirty:
+                self.config_dirty = False
+                ops.append((("config",), store.write_config, *store.render_config(render_config_snapshot())))
+            if self.monitors_dirty:
+                upserts = [(cid, serialize_monitor(monitored[cid])) for cid in self.monitors_dirty if cid in monitored]
+                deletes = [cid for cid in self.monitors_dirty if cid not in monitored]
+                ops.append((("monitors", self.monitors_dirty), store.write_monitors, upserts, deletes))
+            # row-level writes: nothing to compact
+            self.compact_requested = False
+            self.monitors_dirty = set()
+            return ops
+        if self.config_dirty:
+            self.config_dirty = False
+            ops.append((("config",), atomic_write_text, CONFIG_FILE,
+                        json.dumps(render_config_snapshot(), ensure_ascii=False, indent=2)))
+        if self.deletions_dirty:
+            self.deletions_dirty = False
+            ops.append((("deletions",), atomic_write_text, PENDING_DELETIONS_FILE, json.dumps(deletion_scheduler.rows())))
+        pending = len(self.monitors_dirty)
+        if self.compact_requested or (pending and self.journal_entries + pending >= MONITORED_JOURNAL_COMPACT_EVERY):
+            self.journal_gen += 1
+            ops.append((("snapshot", self.journal_entries), write_monitored_snapshot, render_monitored_snapshot(self.journal_gen)))
+            self.journal_entries = 0
+        elif pending:
+            ops.append((("journal", self.monitors_dirty), append_monitored_journal,
+                        render_monitor_deltas(self.monitors_dirty, self.journal_gen)))
+            self.journal_entries += pending
+        self.compact_requested = False
+        self.monitors_dirty = set()
+        return ops
+
+    @staticmethod
+    def _run(ops):
+        """Run the writes; returns the redo entries of those that failed."""
+        failed = []
+        for redo, fn, *args in ops:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Error persisting state ({fn.__name__}), will retry:", e)
+                failed.append(redo)
+        return failed
+
+    def _restore(self, failed):
+        """Mark failed writes dirty again (and undo their journal bookkeeping) so the next flush retries them."""
+        for kind, *rest in failed:
+            if kind == "config":
+                # sqlite: write_config() only adopts its diff state on success, so the next render re-diffs
+                self.config_dirty = True
+            elif kind == "deletions":
+                self.deletions_dirty = True
+            elif kind == "monitors":
+                self.monitors_dirty.update(rest[0])
+            elif kind == "snapshot":
+                # the snapshot on disk (and the journal after it) is still the previous generation
+                self.journal_gen -= 1
+                self.journal_entries = rest[0]
+                self.compact_requested = True
+            elif kind == "journal":
+                self.journal_entries -= len(rest[0])
+                self.monitors_dirty.update(rest[0])
+
+    async def flush(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            ops = self._take()
+            if ops:
+                self.writes += 1
+                failed = await asyncio.get_running_loop().run_in_executor(None, self._run, ops)
+                if failed:
+                    self._restore(failed)
+
+    def flush_sync(self):
+        ops = self._take()
+        if ops:
+            self.writes += 1
+            self._restore(self._run(ops))
+
+
+persistence = PersistenceService()
+
+
+def save_monitored(*cids):
+    """
+    Mark monitor state dirty (written by the persistence service).
+    - save_monitored(cid, ...): one journal line per changed (or removed) channel — O(changed records).
+    - save_monitored(): full compaction into MONITORED_FILE.
+    The journal is compacted automatically every MONITORED_JOURNAL_COMPACT_EVERY entries.
+    """
+    if cids:
+        for cid in cids:
+            touch_monitor_list(monitor_guild_id(cid), state_only=True)
+        persistence.mark_monitors(cids)
+    else:
+        persistence.mark_compact()
+
+
+def replay_monitored_journal(data: dict, gen: int):
+    """
+    Apply journal deltas on top of a loaded snapshot of generation `gen`. Lines from an older generation
+    (crash between snapshot rename and journal truncate) and a torn trailing line are ignored.
+    """
+    if not os.path.exists(MONITORED_JOURNAL_FILE):
+        return
+    with open(MONITORED_JOURNAL_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except Exception:
+                print("Ignoring corrupt monitored journal line.")
+                continue
+            if int(entry.get("gen", 0)) < gen:
+                continue
+            if entry.get("op") == "set":
+                data[entry["id"]] = entry.get("rec") or {}
+            elif entry.get("op") == "del":
+                data.pop(entry["id"], None)
+
+
+def read_json_monitored():
+    """monitored.json snapshot with the journal replayed on top (serialized records keyed by str id), or None."""
+    if not (os.path.exists(MONITORED_FILE) or os.path.exists(MONITORED_JOURNAL_FILE)):
+        return None
+    data = {}
+    if os.path.exists(MONITORED_FILE):
+        with open(MONITORED_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    gen = int(data.pop("_journal_gen", 0))
+    replay_monitored_journal(data, gen)
+    persistence.journal_gen = gen
+    return data
 
 
 def load_monitored():
     global monitored
-    if os.path.exists(MONITORED_FILE):
-        try:
-            with open(MONITORED_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    try:
+        if STORAGE_BACKEND == "sqlite":
+            data = get_sqlite_store().load_monitors()
+        else:
+            data = read_json_monitored()
+        if data is not None:
+            for rec in monitored.values():
+                rec.detach()
             monitored = {}
             for k, v in data.items():
-                cid = int(k)
-                monitored[cid] = {
-                    "log_channel": v.get("log_channel") if v.get("log_channel") is None else int(v.get("log_channel")),
-                    "last_message_time": from_iso(v.get("last_message_time")),
-                    "alert_count": int(v.get("alert_count", 0)),
-                    "alert_message_id": v.get("alert_message_id"),
-                    "alert_sent_time": from_iso(v.get("alert_sent_time")),
-                    "confirmed": bool(v.get("confirmed", False)),
-                    "confirmed_by": int(v.get("confirmed_by")) if v.get("confirmed_by") else None
-                }
+                monitored[int(k)] = deserialize_monitor(v)
+            if STORAGE_BACKEND != "sqlite":
+                # fold the replayed journal into the snapshot
+                save_monitored()
             return
-        except Exception as e:
-            print("Failed to load monitored.json:", e)
+    except Exception as e:
+        print("Failed to load monitored state:", e)
     monitored = {}
     save_monitored()
 
 
 def save_config():
+    """Mark config dirty; the persistence service coalesces bursts into one write."""
+    persistence.mark_config()
+
+
+def read_json_pending_deletions():
+    """[[channel_id, message_id, due_ts, monitor_cid]] from PENDING_DELETIONS_FILE, or None."""
+    if not os.path.exists(PENDING_DELETIONS_FILE):
+        return None
+    with open(PENDING_DELETIONS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_pending_deletions():
+    """Re-arm deletions scheduled before a restart (overdue ones run on the scheduler's first pass)."""
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        if STORAGE_BACKEND == "sqlite":
+            rows = get_sqlite_store().load_pending_deletions()
+        else:
+            rows = read_json_pending_deletions()
+        deletion_scheduler.load(rows or [])
     except Exception as e:
-        print("Error saving config:", e)
+        print("Failed to load pending deletions:", e)
+
+
+def read_json_config():
+    """Raw config.json contents, or None when the file doesn't exist."""
+    if not os.path.exists(CONFIG_FILE):
+        return None
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def load_config():
@@ -127,29 +835,31 @@ def load_config():
     - loads saved scan interval (if any) into global CHECK_INTERVAL_SECONDS
     """
     global config, CHECK_INTERVAL_SECONDS
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
-            if isinstance(cfg, dict):
-                if "guilds" not in cfg:
-                    ui = cfg.get("ui_channel_id")
-                    cfg = {"ui_channel_id": ui, "guilds": {}}
-                # ensure remaining_msg_id exists for each guild entry
-                for gid, ent in cfg.get("guilds", {}).items():
-                    if isinstance(ent, dict) and "remaining_msg_id" not in ent:
-                        ent["remaining_msg_id"] = None
-                # load saved scan interval if present
-                if "scan_interval" in cfg and isinstance(cfg["scan_interval"], int):
-                    CHECK_INTERVAL_SECONDS = int(cfg["scan_interval"])
-                config = cfg
-            else:
-                config = {"ui_channel_id": None, "guilds": {}}
-            return
-        except Exception as e:
-            print("Failed to load config.json:", e)
+    try:
+        cfg = get_sqlite_store().load_config() if STORAGE_BACKEND == "sqlite" else read_json_config()
+    except Exception as e:
+        print("Failed to load config:", e)
+        cfg = None
+    if cfg is not None:
+        if isinstance(cfg, dict):
+            if "guilds" not in cfg:
+                ui = cfg.get("ui_channel_id")
+                cfg = {"ui_channel_id": ui, "guilds": {}}
+            # ensure remaining_msg_id exists for each guild entry
+            for gid, ent in cfg.get("guilds", {}).items():
+                if isinstance(ent, dict) and "remaining_msg_id" not in ent:
+                    ent["remaining_msg_id"] = None
+            # load saved scan interval if present
+            if "scan_interval" in cfg and isinstance(cfg["scan_interval"], int):
+                CHECK_INTERVAL_SECONDS = int(cfg["scan_interval"])
+            config = cfg
+        else:
+            config = {"ui_channel_id": None, "guilds": {}}
+        rebuild_guild_index()
+        return
     # default structure
     config = {"ui_channel_id": None, "guilds": {}, "scan_interval": CHECK_INTERVAL_SECONDS}
+    rebuild_guild_index()
     save_config()
 
 
@@ -159,7 +869,8 @@ def ensure_guild_entry(guild_id: int):
     if "guilds" not in config:
         config["guilds"] = {}
     if gid not in config["guilds"]:
-        config["guilds"][gid] = {"log_channel_id": None, "ui_channel_id": None, "monitored": [], "remaining_msg_id": None}
+        config["guilds"][gid] = {"log_channel_id": None, "ui_channel_id": None, "remaining_msg_id": None,
+                                 "scan_interval": None, "threshold": None, "channel_overrides": {}}
     else:
         if "remaining_msg_id" not in config["guilds"][gid]:
             config["guilds"][gid]["remaining_msg_id"] = None
@@ -177,6 +888,7 @@ def get_guild_log_channel(guild_id: int):
 def set_guild_log_channel(guild_id: int, channel_id: int):
     ent = ensure_guild_entry(guild_id)
     ent["log_channel_id"] = int(channel_id)
+    touch_monitor_list(int(guild_id), state_only=True)
     save_config()
 
 
@@ -194,24 +906,51 @@ def set_guild_ui_channel(guild_id: int, channel_id: int):
     save_config()
 
 
+def rebuild_guild_index():
+    """Move the loaded guild entries' "monitored" lists into guild_members / monitor_guilds."""
+    guild_members.clear()
+    monitor_guilds.clear()
+    for gid, ent in config.get("guilds", {}).items():
+        members = guild_members.setdefault(int(gid), set())
+        for cid in ent.pop("monitored", None) or []:
+            members.add(int(cid))
+            monitor_guilds[int(cid)] = int(gid)
+
+
+def render_config_snapshot():
+    """config as persisted: each guild entry gets its "monitored" list back from the index."""
+    guilds = {gid: dict(ent, monitored=sorted(guild_members.get(int(gid), ())))
+              for gid, ent in config.get("guilds", {}).items()}
+    return dict(config, guilds=guilds)
+
+
 def guild_monitored_list(guild_id: int):
-    ent = ensure_guild_entry(guild_id)
-    return ent.get("monitored", [])
+    """Set of channel ids monitored in this guild (live view of the index — copy it before awaiting)."""
+    return guild_members.get(int(guild_id)) or set()
+
+
+def monitor_guild_id(channel_id: int):
+    """Guild a monitored channel belongs to, or None."""
+    return monitor_guilds.get(channel_id)
 
 
 def add_guild_monitored(guild_id: int, channel_id: int):
-    ent = ensure_guild_entry(guild_id)
-    arr = ent.setdefault("monitored", [])
-    if channel_id not in arr:
-        arr.append(channel_id)
+    ensure_guild_entry(guild_id)
+    members = guild_members.setdefault(int(guild_id), set())
+    if channel_id not in members:
+        members.add(channel_id)
+        monitor_guilds[channel_id] = int(guild_id)
+        touch_monitor_list(int(guild_id))
         save_config()
 
 
 def remove_guild_monitored(guild_id: int, channel_id: int):
-    ent = ensure_guild_entry(guild_id)
-    arr = ent.setdefault("monitored", [])
-    if channel_id in arr:
-        arr.remove(channel_id)
+    members = guild_members.get(int(guild_id))
+    if members and channel_id in members:
+        members.discard(channel_id)
+        if monitor_guilds.get(channel_id) == int(guild_id):
+            monitor_guilds.pop(channel_id, None)
+        touch_monitor_list(int(guild_id))
         save_config()
 
 
@@ -221,6 +960,18 @@ def get_guild_lock(guild_id: int):
     return guild_locks[guild_id]
 
 
+def get_log_channel_lock(channel_id: int):
+    if channel_id not in log_channel_locks:
+        log_channel_locks[channel_id] = asyncio.Lock()
+    return log_channel_locks[channel_id]
+
+
+def get_guild_scan_semaphore(guild_id: int):
+    if guild_id not in guild_scan_semaphores:
+        guild_scan_semaphores[guild_id] = asyncio.Semaphore(max(1, SCAN_CONCURRENCY_PER_GUILD))
+    return guild_scan_semaphores[guild_id]
+
+
 def get_guild_remaining_msg_id(guild_id: int):
     ent = ensure_guild_entry(guild_id)
     mid = ent.get("remaining_msg_id")
@@ -229,6 +980,8 @@ def get_guild_remaining_msg_id(guild_id: int):
 
 def set_guild_remaining_msg_id(guild_id: int, message_id: int | None):
     ent = ensure_guild_entry(guild_id)
+    if ent.get("remaining_msg_id") != (int(message_id) if message_id else None):
+        invalidate_remaining_handle(guild_id)
     ent["remaining_msg_id"] = int(message_id) if message_id else None
     # Clear cache if message id removed or changed
     if message_id is None:
@@ -242,18 +995,141 @@ def set_guild_remaining_msg_id(guild_id: int, message_id: int | None):
 def set_global_scan_interval(seconds: int):
     """
     Set global CHECK_INTERVAL_SECONDS and persist to config.
-    Also update check_loop interval if running.
+    Guilds without their own interval pick it up on their next timeline (and the deadline schedule is rebuilt).
     """
     global CHECK_INTERVAL_SECONDS
     CHECK_INTERVAL_SECONDS = max(1, int(seconds))
     config["scan_interval"] = CHECK_INTERVAL_SECONDS
     save_config()
-    # change running loop interval if running
+    # repeat-alert deadlines depend on the interval
+    rebuild_schedule()
+
+
+# ---------------- Per-guild / per-channel schedule ----------------
+def channel_override(guild_id: int, channel_id: int):
+    ent = config.get("guilds", {}).get(str(guild_id)) or {}
+    return (ent.get("channel_overrides") or {}).get(str(channel_id)) or {}
+
+
+def guild_scan_interval(guild_id: int):
+    ent = config.get("guilds", {}).get(str(guild_id)) or {}
+    return int(ent.get("scan_interval") or CHECK_INTERVAL_SECONDS)
+
+
+def guild_threshold(guild_id: int):
+    ent = config.get("guilds", {}).get(str(guild_id)) or {}
+    return int(ent.get("threshold") or THRESHOLD_SECONDS)
+
+
+def monitor_scan_interval(channel_id: int, guild_id: int):
+    """Channel override, else the guild's interval, else CHECK_INTERVAL_SECONDS."""
+    if guild_id is None:
+        return CHECK_INTERVAL_SECONDS
+    return int(channel_override(guild_id, channel_id).get("scan_interval") or guild_scan_interval(guild_id))
+
+
+def monitor_threshold(channel_id: int, guild_id: int):
+    """Channel override, else the guild's threshold, else THRESHOLD_SECONDS."""
+    if guild_id is None:
+        return THRESHOLD_SECONDS
+    return int(channel_override(guild_id, channel_id).get("threshold") or guild_threshold(guild_id))
+
+
+def set_guild_schedule(guild_id: int, scan_interval: int | None = None, threshold: int | None = None):
+    """Set this guild's interval/threshold; 0 clears the override (back to the global default), None leaves it."""
+    ent = ensure_guild_entry(guild_id)
+    if scan_interval is not None:
+        ent["scan_interval"] = max(1, int(scan_interval)) if scan_interval else None
+    if threshold is not None:
+        ent["threshold"] = max(1, int(threshold)) if threshold else None
+    save_config()
+    guild_next_check[int(guild_id)] = datetime.now(timezone.utc) + timedelta(seconds=guild_scan_interval(guild_id))
+    reschedule_guild(guild_id)
+
+
+def set_channel_schedule(guild_id: int, channel_id: int, scan_interval: int | None = None, threshold: int | None = None):
+    """Same as set_guild_schedule for one channel; an override with nothing left is dropped."""
+    ent = ensure_guild_entry(guild_id)
+    overrides = ent.setdefault("channel_overrides", {})
+    ov = dict(overrides.get(str(channel_id)) or {})
+    if scan_interval is not None:
+        ov["scan_interval"] = max(1, int(scan_interval)) if scan_interval else None
+    if threshold is not None:
+        ov["threshold"] = max(1, int(threshold)) if threshold else None
+    ov = {k: v for k, v in ov.items() if v}
+    if ov:
+        overrides[str(channel_id)] = ov
+    else:
+        overrides.pop(str(channel_id), None)
+    save_config()
+    channel_next_check.pop(int(channel_id), None)
+    schedule_monitor(int(channel_id), int(guild_id))
+
+
+def guild_remaining_seconds(guild_id: int, now: datetime = None):
+    nxt = guild_next_check.get(int(guild_id))
+    if nxt is None:
+        return guild_scan_interval(guild_id)
+    return max(0, int((nxt - (now or datetime.now(timezone.utc))).total_seconds()))
+
+
+# ---------------- Channel resolver ----------------
+async def resolve_channel(channel_id: int):
+    """
+    Replacement for `bot.get_channel(x) or await bot.fetch_channel(x)`:
+    gateway cache first, then channels we fetched recently, then a single fetch_channel().
+    NotFound / Forbidden is cached (negative TTL) and re-raised, like fetch_channel would.
+    """
+    channel_id = int(channel_id)
+    ch = bot.get_channel(channel_id)
+    if ch is not None:
+        return ch
+    now_ts = time.monotonic()
+    hit = channel_cache.get(channel_id)
+    if hit is not None:
+        if hit[1] > now_ts:
+            return hit[0]
+        channel_cache.pop(channel_id, None)
+    miss = channel_misses.get(channel_id)
+    if miss is not None:
+        if miss[0] > now_ts:
+            perf_counters["channel_negative_hits"] += 1
+            raise miss[1].with_traceback(None)
+        channel_misses.pop(channel_id, None)
+    perf_counters["channel_fetches"] += 1
     try:
-        if check_loop.is_running():
-            check_loop.change_interval(seconds=CHECK_INTERVAL_SECONDS)
-    except Exception:
-        pass
+        ch = await bot.fetch_channel(channel_id)
+    except (discord.NotFound, discord.Forbidden) as e:
+        channel_misses[channel_id] = (now_ts + CHANNEL_NEGATIVE_TTL_SECONDS, e)
+        raise
+    channel_cache[channel_id] = (ch, now_ts + CHANNEL_CACHE_TTL_SECONDS)
+    return ch
+
+
+def invalidate_channel(channel_id: int):
+    channel_cache.pop(int(channel_id), None)
+    channel_misses.pop(int(channel_id), None)
+
+
+@bot.listen("on_guild_channel_delete")
+async def forget_deleted_channel(channel: discord.abc.GuildChannel):
+    invalidate_channel(channel.id)
+    if list_name_keys.pop(channel.id, None) is not None:
+        touch_monitor_list(channel.guild.id)
+
+
+@bot.listen("on_guild_channel_update")
+async def forget_updated_channel(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    # the gateway cache now holds the fresh object; drop any REST copy
+    invalidate_channel(after.id)
+    if before.name != after.name and after.id in monitor_guilds:
+        list_name_keys.pop(after.id, None)
+        touch_monitor_list(monitor_guild_id(after.id))
+
+
+@bot.listen("on_guild_channel_create")
+async def forget_created_channel(channel: discord.abc.GuildChannel):
+    invalidate_channel(channel.id)
 
 
 # ---------------- Utility ----------------
@@ -286,56 +1162,218 @@ def parse_channel_argument(arg: str):
     return None
 
 
-async def _delete_message_later(channel: discord.abc.Messageable, message_id: int, delay: int):
-    await asyncio.sleep(delay)
-    try:
-        m = await channel.fetch_message(message_id)
-        await m.delete()
-    except Exception:
-        pass
+# ---------------- Deferred deletions ----------------
+class DeletionScheduler:
+    """
+    One heap of pending deletions instead of one sleeping task per message. Message deletions are
+    persisted (PENDING_DELETIONS_FILE / sqlite) so they survive a restart; interaction responses and
+    ephemeral followups can only be deleted through the interaction webhook, so they are kept in memory
+    (their token expires after 15 minutes anyway). Everything due (within DELETION_BATCH_WINDOW_SECONDS)
+    is taken in one pass and deleted grouped per channel, straight by id (no fetch_message round-trip):
+    up to 100 recent messages per bulk-delete call, one call per message only for old ones.
+    """
 
+    def __init__(self):
+        self._heap = []           # (due_ts, seq, key) — key is ("m", message_id) or ("w", seq)
+        self._messages = {}       # message_id -> (due_ts, channel_id, monitor_cid)
+        self._webhook_items = {}  # seq -> Interaction (original response) or WebhookMessage
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._sleep_until = None
+        self.deleted = 0
+
+    def __len__(self):
+        return len(self._messages) + len(self._webhook_items)
+
+    def _push(self, due_ts: float, key: tuple):
+        heapq.heappush(self._heap, (due_ts, next(self._seq), key))
+        if self._sleep_until is None or due_ts < self._sleep_until:
+            self._wake.set()
+
+    def delete_message(self, channel_id: int, message_id: int, delay: float, monitor_cid: int = None):
+        due = time.time() + max(0, delay)
+        self._messages[int(message_id)] = (due, int(channel_id), monitor_cid)
+        self._push(due, ("m", int(message_id)))
+        persistence.mark_deletions()
+
+    def delete_via_webhook(self, item, delay: float):
+        """item: an Interaction (its original response is deleted) or a WebhookMessage."""
+        seq = next(self._seq)
+        self._webhook_items[seq] = item
+        self._push(time.time() + max(0, delay), ("w", seq))
+
+    def forget(self, message_id: int):
+        """The message is already gone (deleted by someone else)."""
+        if self._messages.pop(int(message_id), None) is not None:
+            persistence.mark_deletions()
+
+    def rows(self):
+        return [[cid, mid, due, mon] for mid, (due, cid, mon) in self._messages.items()]
+
+    def load(self, rows):
+        for cid, mid, due, mon in rows:
+            if int(mid) in self._messages:
+                continue
+            self._messages[int(mid)] = (float(due), int(cid), int(mon) if mon else None)
+            self._push(float(due), ("m", int(mid)))
+
+    def pop_due(self, now_ts: float):
+        """Return ({channel_id: [(message_id, monitor_cid)]}, [webhook item]) for everything due."""
+        messages, webhook_items = {}, []
+        while self._heap and self._heap[0][0] <= now_ts:
+            due, _, (kind, ident) = heapq.heappop(self._heap)
+            if kind == "w":
+                item = self._webhook_items.pop(ident, None)
+                if item is not None:
+                    webhook_items.append(item)
+                continue
+            cur = self._messages.get(ident)
+            if cur is None or cur[0] != due:
+                # already deleted / rescheduled -> stale heap entry
+                continue
+            del self._messages[ident]
+            messages.setdefault(cur[1], []).append((ident, cur[2]))
+        return messages, webhook_items
+
+    async def _delete_in_channel(self, channel_id: int, items: list):
+        # one channel = one rate-limit bucket -> sequential within the channel
+        channel = bot.get_partial_messageable(channel_id)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=BULK_DELETE_MAX_AGE_SECONDS)
+        recent = [mid for mid, _ in items if discord.utils.snowflake_time(mid) > cutoff]
+        singles = [mid for mid, _ in items if discord.utils.snowflake_time(mid) <= cutoff]
+        for i in range(0, len(recent), 100):
+            chunk = recent[i:i + 100]
+            if len(chunk) < 2:
+                singles.extend(chunk)
+                continue
+            try:
+                await bot.http.delete_messages(channel_id, chunk)
+                self.deleted += len(chunk)
+                perf_counters["bulk_deletes"] += 1
+            except discord.HTTPException:
+                # e.g. an id is unknown/too old -> fall back to deleting them one by one
+                singles.extend(chunk)
+        for message_id in singles:
+            try:
+                await channel.get_partial_message(message_id).delete()
+                self.deleted += 1
+                perf_counters["single_deletes"] += 1
+            except Exception:
+                pass
+        for message_id, monitor_cid in items:
+            if monitor_cid:
+                _clear_deleted_alert(monitor_cid, message_id)
 
-async def _delete_message_obj_later(msg: discord.Message, delay: int):
-    await asyncio.sleep(delay)
-    try:
-        await msg.delete()
-    except Exception:
-        pass
+    async def _delete_via_webhook(self, item):
+        try:
+            if isinstance(item, discord.Interaction):
+                await item.delete_original_response()
+            else:
+                await item.delete()
+            self.deleted += 1
+        except Exception:
+            pass
 
+    async def run(self):
+        while True:
+            try:
+                messages, webhook_items = self.pop_due(time.time() + DELETION_BATCH_WINDOW_SECONDS)
+                if messages:
+                    persistence.mark_deletions()
+                if messages or webhook_items:
+                    await asyncio.gather(*(self._delete_in_channel(cid, items) for cid, items in messages.items()),
+                                         *(self._delete_via_webhook(i) for i in webhook_items))
+                now_ts = time.time()
+                sleep_for = 60.0 if not self._heap else min(60.0, max(0.0, self._heap[0][0] - now_ts))
+                self._sleep_until = now_ts + sleep_for
+                self._wake.clear()
+                try:
+                    # asyncio.timeout, not wait_for: wait_for (3.11) swallows a cancel() landing with _wake.set()
+                    async with asyncio.timeout(sleep_for):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+                self._sleep_until = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("Error in deletion scheduler:", e)
+                await asyncio.sleep(1)
 
-async def _delete_message_and_clear(channel_id: int, message_id: int, delay: int, monitor_cid: int = None):
-    await asyncio.sleep(delay)
-    try:
-        ch = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
-        m = await ch.fetch_message(message_id)
-        await m.delete()
-    except Exception:
-        pass
-    if monitor_cid:
-        preserved_alerts.pop(monitor_cid, None)
-        rec = monitored.get(monitor_cid)
-        if rec and rec.get("alert_message_id") == message_id:
-            rec["alert_message_id"] = None
-            rec["alert_sent_time"] = None
-            save_monitored()
+
+deletion_scheduler = DeletionScheduler()
+
+
+def _delete_message_later(channel: discord.abc.Messageable, message_id: int, delay: int):
+    deletion_scheduler.delete_message(channel.id, message_id, delay)
+
+
+def _delete_message_obj_later(msg: discord.Message, delay: int):
+    if isinstance(msg, discord.WebhookMessage):
+        # (ephemeral) followups are only deletable through the interaction webhook
+        deletion_scheduler.delete_via_webhook(msg, delay)
+    else:
+        deletion_scheduler.delete_message(msg.channel.id, msg.id, delay)
+
+
+def _delete_message_and_clear(channel_id: int, message_id: int, delay: int, monitor_cid: int = None):
+    deletion_scheduler.delete_message(channel_id, message_id, delay, monitor_cid)
+
+
+def _clear_deleted_alert(monitor_cid: int, message_id: int):
+    drop_preserved_alert(monitor_cid)
+    rec = monitored.get(monitor_cid)
+    if rec and rec.alert_message_id == message_id:
+        rec.alert_message_id = None
+        rec.alert_sent_ts = 0
+        save_monitored(monitor_cid)
 
 
 # Delete original response (works for ephemeral & non-ephemeral original responses)
-async def _delete_original_after(interaction: discord.Interaction, delay: int):
-    await asyncio.sleep(delay)
-    try:
-        await interaction.delete_original_response()
-    except Exception:
-        pass
+def _delete_original_after(interaction: discord.Interaction, delay: int):
+    deletion_scheduler.delete_via_webhook(interaction, delay)
+
+
+@bot.listen("on_raw_message_delete")
+async def forget_pending_deletion(payload: discord.RawMessageDeleteEvent):
+    deletion_scheduler.forget(payload.message_id)
+
+
+@bot.listen("on_raw_bulk_message_delete")
+async def forget_pending_bulk_deletion(payload: discord.RawBulkMessageDeleteEvent):
+    for mid in payload.message_ids:
+        deletion_scheduler.forget(mid)
 
 
 # ---------------- Remaining-time embed builder (NO progress bar — only remaining time) ----------------
+def remaining_signature(guild_id: int):
+    """What a relative-mode countdown renders; the message only needs an edit when this changes."""
+    nxt = guild_next_check.get(int(guild_id))
+    target = int(nxt.timestamp()) if nxt else None
+    st = scan_stats.get(int(guild_id))
+    return (target, st["finished_at"] if st else None)
+
+
+def mark_remaining_rendered(guild_id: int, mmss: str, when: datetime = None):
+    remaining_cache[str(guild_id)] = {"last_str": mmss, "last_update": when or datetime.now(timezone.utc),
+                                      "last_sig": remaining_signature(guild_id)}
+
+
 def build_remaining_embed(guild_id: int, remaining_seconds: int):
     rem = max(0, int(remaining_seconds))
     mmss = f"{rem // 60:02d}:{rem % 60:02d}"
     embed = discord.Embed(title="⏱️ Next scan countdown", color=0x3498DB, timestamp=datetime.now(timezone.utc))
-    embed.add_field(name="Remaining", value=f"{mmss} ({rem}s)", inline=True)
-    embed.set_footer(text="Scan interval (seconds): " + str(CHECK_INTERVAL_SECONDS))
+    if COUNTDOWN_MODE == "relative":
+        # rendered by the client, stays correct without further edits
+        nxt = guild_next_check.get(int(guild_id))
+        ts = int(nxt.timestamp()) if nxt else int(datetime.now(timezone.utc).timestamp()) + rem
+        embed.add_field(name="Next scan", value=f"<t:{ts}:R> (<t:{ts}:T>)", inline=True)
+    else:
+        embed.add_field(name="Remaining", value=f"{mmss} ({rem}s)", inline=True)
+    st = scan_stats.get(int(guild_id))
+    if st:
+        embed.add_field(name="Last scan", value=f"{st['channels']} channel • {st['duration']:.2f}s", inline=True)
+    embed.set_footer(text=f"Scan interval (seconds): {guild_scan_interval(guild_id)} • Threshold: {guild_threshold(guild_id)}s")
     return embed
 
 
@@ -374,15 +1412,15 @@ class RemainingView(discord.ui.View):
 
 async def manual_scan_and_reset(guild: discord.Guild):
     """
-    Background task to perform a manual scan for a guild, then reset the next_check_time and update remaining message.
+    Background task to perform a manual scan for a guild, then reset its next check time and update remaining message.
     """
-    global next_check_time
     try:
         await perform_scan_for_guild(guild)
     except Exception as e:
         print(f"Error during manual_scan_for guild {guild.id}: {e}")
-    # reset countdown
-    next_check_time = datetime.now(timezone.utc) + timedelta(seconds=CHECK_INTERVAL_SECONDS)
+    # reset countdown (this guild only)
+    guild_next_check[guild.id] = datetime.now(timezone.utc) + timedelta(seconds=guild_scan_interval(guild.id))
+    deadline_scheduler.wake()
     # ensure/update remaining message
     try:
         await ensure_remaining_message_for_guild(guild.id)
@@ -406,12 +1444,45 @@ async def send_in_log_channel(log_ch, content=None, embed=None, view=None, persi
 
     if not persistent:
         try:
-            asyncio.create_task(_delete_message_later(log_ch, sent.id, AUTO_DELETE_SECONDS))
+            _delete_message_later(log_ch, sent.id, AUTO_DELETE_SECONDS)
         except Exception:
             pass
     return sent
 
 
+# ---------------- Remaining message handle cache ----------------
+def get_remaining_handle(guild_id: int, log_ch, message_id: int):
+    """
+    Message handle for the remaining-time message. Cached per guild; building a PartialMessage costs no
+    HTTP call, so every edit through it saves the GET that fetch_message() used to do.
+    """
+    handle = remaining_msg_handles.get(int(guild_id))
+    if handle is None or handle.id != int(message_id) or handle.channel.id != log_ch.id:
+        handle = log_ch.get_partial_message(int(message_id))
+        remaining_msg_handles[int(guild_id)] = handle
+    perf_counters["remaining_fetch_avoided"] += 1
+    return handle
+
+
+def invalidate_remaining_handle(guild_id: int):
+    if remaining_msg_handles.pop(int(guild_id), None) is not None:
+        perf_counters["remaining_handle_invalidations"] += 1
+
+
+@bot.listen("on_raw_message_delete")
+async def forget_deleted_remaining_message(payload: discord.RawMessageDeleteEvent):
+    for gid, ent in config.get("guilds", {}).items():
+        if ent.get("remaining_msg_id") == payload.message_id:
+            set_guild_remaining_msg_id(int(gid), None)
+
+
+@bot.listen("on_raw_bulk_message_delete")
+async def forget_bulk_deleted_remaining_message(payload: discord.RawBulkMessageDeleteEvent):
+    for gid, ent in config.get("guilds", {}).items():
+        if ent.get("remaining_msg_id") in payload.message_ids:
+            set_guild_remaining_msg_id(int(gid), None)
+
+
 # ---------------- Ensure single remaining message exists / update ----------------
 async def ensure_remaining_message_for_guild(guild_id: int):
     """
@@ -427,7 +1498,7 @@ async def ensure_remaining_message_for_guild(guild_id: int):
 
     # Try to fetch channel
     try:
-        log_ch = bot.get_channel(int(log_ch_id)) or await bot.fetch_channel(int(log_ch_id))
+        log_ch = await resolve_channel(int(log_ch_id))
     except Exception as e:
         print(f"Cannot access log channel {log_ch_id} for remaining timer: {e}")
         return None
@@ -435,18 +1506,19 @@ async def ensure_remaining_message_for_guild(guild_id: int):
     # If there's already a message id configured, check it and ensure it exists in this channel
     mid = ent.get("remaining_msg_id")
     now = datetime.now(timezone.utc)
-    rem = CHECK_INTERVAL_SECONDS if next_check_time is None else max(0, int((next_check_time - now).total_seconds()))
+    rem = guild_remaining_seconds(guild_id, now)
     embed = build_remaining_embed(guild_id, rem)
     mmss = f"{max(0, rem) // 60:02d}:{max(0, rem) % 60:02d}"
 
     if mid:
         try:
-            msg = await log_ch.fetch_message(int(mid))
-            # update embed & view immediately (best-effort)
+            msg = get_remaining_handle(guild_id, log_ch, int(mid))
+            # update embed & view immediately (best-effort); a missing message surfaces as NotFound here
             try:
                 await msg.edit(embed=embed, view=RemainingView())
+                perf_counters["remaining_edits"] += 1
                 # update cache
-                remaining_cache[str(guild_id)] = {"last_str": mmss, "last_update": datetime.now(timezone.utc)}
+                mark_remaining_rendered(guild_id, mmss)
             except Exception:
                 # If editing fails (maybe message deleted or moved), clear stored id and continue to find/create
                 set_guild_remaining_msg_id(guild_id, None)
@@ -459,10 +1531,7 @@ async def ensure_remaining_message_for_guild(guild_id: int):
                     if m.author and m.author.id == bot.user.id and m.embeds:
                         e = m.embeds[0]
                         if e.title and "Next scan countdown" in e.title:
-                            try:
-                                await m.delete()
-                            except:
-                                pass
+                            deletion_scheduler.delete_message(log_ch.id, m.id, DELETION_BATCH_WINDOW_SECONDS)
             except Exception:
                 pass
             return msg.id
@@ -485,14 +1554,11 @@ async def ensure_remaining_message_for_guild(guild_id: int):
     if candidates:
         chosen = candidates[0]
         for c in candidates[1:]:
-            try:
-                await c.delete()
-            except:
-                pass
+            deletion_scheduler.delete_message(log_ch.id, c.id, DELETION_BATCH_WINDOW_SECONDS)
         # update chosen embed & view and save id
         try:
             await chosen.edit(embed=embed, view=RemainingView())
-            remaining_cache[str(guild_id)] = {"last_str": mmss, "last_update": datetime.now(timezone.utc)}
+            mark_remaining_rendered(guild_id, mmss)
         except Exception:
             pass
         set_guild_remaining_msg_id(guild_id, chosen.id)
@@ -504,7 +1570,7 @@ async def ensure_remaining_message_for_guild(guild_id: int):
         if not sent:
             return None
         set_guild_remaining_msg_id(guild_id, sent.id)
-        remaining_cache[str(guild_id)] = {"last_str": mmss, "last_update": datetime.now(timezone.utc)}
+        mark_remaining_rendered(guild_id, mmss)
         print(f"Created remaining-timer message {sent.id} in log channel {log_ch.id} for guild {guild_id}")
         return sent.id
     except Exception as e:
@@ -516,77 +1582,80 @@ async def ensure_remaining_message_for_guild(guild_id: int):
 async def update_remaining_messages_loop():
     """
     Background task: every 1 second evaluate whether to update remaining-time message(s) for guilds.
-    Uses per-guild throttling to avoid hitting API rate limits.
+    Uses per-guild throttling to avoid hitting API rate limits. In COUNTDOWN_MODE "relative" the check
+    is purely in-memory and a message is only edited when the guild's next check time (or its last scan) changed.
     """
-    global next_check_time
     while True:
         try:
             now = datetime.now(timezone.utc)
-            if next_check_time is None:
-                base_remaining = CHECK_INTERVAL_SECONDS
-            else:
-                rem_td = (next_check_time - now)
-                base_remaining = max(0, int(rem_td.total_seconds()))
-
             guilds = list(config.get("guilds", {}).items())
             for gid, ent in guilds:
                 try:
                     log_ch_id = ent.get("log_channel_id")
                     if not log_ch_id:
                         continue
-                    # ensure channel object
-                    try:
-                        log_ch = bot.get_channel(int(log_ch_id)) or await bot.fetch_channel(int(log_ch_id))
-                    except Exception:
-                        continue
 
-                    # Compute remaining for this guild — we assume a global next_check_time so same base_remaining applies,
-                    # but keep function in case next_check_time differs in future per-guild.
-                    remaining = base_remaining
-                    if remaining < 0:
-                        remaining = 0
-
-                    # decide update frequency based on remaining seconds
-                    if remaining > 300:
-                        min_interval = 30
-                    elif remaining > 60:
-                        min_interval = 10
-                    elif remaining > 10:
-                        min_interval = 5
-                    else:
-                        min_interval = 1
+                    # every guild runs on its own timeline
+                    remaining = guild_remaining_seconds(int(gid), now)
 
                     key = str(gid)
                     cache = remaining_cache.get(key)
                     mmss = f"{remaining // 60:02d}:{remaining % 60:02d}"
                     now_ts = datetime.now(timezone.utc)
 
-                    # If we have a cache entry and it's recent enough, skip
-                    if cache:
-                        last_update = cache.get("last_update")
-                        last_str = cache.get("last_str")
-                        if last_update and (now_ts - last_update).total_seconds() < min_interval:
-                            # skip update due to throttle
-                            continue
-                        if last_str == mmss and last_update:
-                            # content unchanged, but maybe enough time passed to update embed timestamp — we can skip to reduce edits
-                            # Only force update if last_update older than min_interval * 2 to refresh timestamp
-                            if (now_ts - last_update).total_seconds() < (min_interval * 2):
+                    if COUNTDOWN_MODE == "relative":
+                        # the client counts down by itself: edit only when the target (or last-scan stats) changed
+                        if cache and ent.get("remaining_msg_id"):
+                            if cache.get("last_sig") == remaining_signature(int(gid)):
+                                continue
+                            last_update = cache.get("last_update")
+                            if last_update and (now_ts - last_update).total_seconds() < COUNTDOWN_MIN_EDIT_SECONDS:
                                 continue
+                    else:
+                        # decide update frequency based on remaining seconds
+                        if remaining > 300:
+                            min_interval = 30
+                        elif remaining > 60:
+                            min_interval = 10
+                        elif remaining > 10:
+                            min_interval = 5
+                        else:
+                            min_interval = 1
+
+                        # If we have a cache entry and it's recent enough, skip
+                        if cache:
+                            last_update = cache.get("last_update")
+                            last_str = cache.get("last_str")
+                            if last_update and (now_ts - last_update).total_seconds() < min_interval:
+                                # skip update due to throttle
+                                continue
+                            if last_str == mmss and last_update:
+                                # content unchanged, but maybe enough time passed to update embed timestamp — we can skip to reduce edits
+                                # Only force update if last_update older than min_interval * 2 to refresh timestamp
+                                if (now_ts - last_update).total_seconds() < (min_interval * 2):
+                                    continue
+
+                    # ensure channel object (only once we know an edit is needed)
+                    try:
+                        log_ch = await resolve_channel(int(log_ch_id))
+                    except Exception:
+                        continue
 
                     # If we have a saved remaining message id, attempt to edit it; otherwise ensure it's created
                     mid = ent.get("remaining_msg_id")
                     if mid:
                         try:
-                            msg = await log_ch.fetch_message(int(mid))
+                            msg = get_remaining_handle(int(gid), log_ch, int(mid))
                             embed = build_remaining_embed(int(gid), remaining)
                             try:
                                 await msg.edit(embed=embed)
+                                perf_counters["remaining_edits"] += 1
                                 # update cache
-                                remaining_cache[key] = {"last_str": mmss, "last_update": now_ts}
+                                mark_remaining_rendered(int(gid), mmss, now_ts)
                             except discord.HTTPException as e:
                                 # On any HTTP error (including 429), don't spam edits; clear saved id if message removed
                                 if e.status == 404:
+                                    invalidate_remaining_handle(int(gid))
                                     set_guild_remaining_msg_id(int(gid), None)
                                 # otherwise just continue; discord.py will handle rate-limit backoff
                                 continue
@@ -610,130 +1679,513 @@ async def update_remaining_messages_loop():
                         except Exception:
                             pass
 
-                except Exception:
-                    # per-guild error should not stop the loop
-                    continue
-        except Exception as e:
-            print("Error in update_remaining_messages_loop:", e)
-        await asyncio.sleep(1)
+                except Exception:
+                    # per-guild error should not stop the loop
+                    continue
+        except Exception as e:
+            print("Error in update_remaining_messages_loop:", e)
+        await asyncio.sleep(1)
+
+
+# ---------------- Deadline scheduler (SCAN_MODE == "deadline") ----------------
+class DeadlineScheduler:
+    """
+    Per-guild min-heaps of per-channel deadlines (epoch seconds), so every guild runs on its own
+    timeline: a guild's due channels are scanned in their own task and a slow guild never delays
+    another one. Only the earliest entry per channel lives in a heap; later deadlines are kept in
+    _deadlines and re-pushed lazily when a stale entry is popped, so each heap stays ~one entry per
+    monitor no matter how often on_message reschedules.
+    """
+
+    def __init__(self):
+        self._heaps = {}       # guild_id -> [(deadline_ts, cid)]
+        self._deadlines = {}   # cid -> (deadline_ts, guild_id)
+        self._wake = asyncio.Event()
+        self._sleep_until = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, cid: int, guild_id: int, when_ts: float):
+        prev = self._deadlines.get(cid)
+        self._deadlines[cid] = (when_ts, guild_id)
+        if prev is None or when_ts < prev[0] or prev[1] != guild_id:
+            heapq.heappush(self._heaps.setdefault(guild_id, []), (when_ts, cid))
+        if self._sleep_until is None or when_ts < self._sleep_until:
+            self._wake.set()
+
+    def unschedule(self, cid: int):
+        self._deadlines.pop(cid, None)
+
+    def clear(self, guild_id: int = None):
+        if guild_id is None:
+            self._heaps.clear()
+            self._deadlines.clear()
+        else:
+            self._heaps.pop(guild_id, None)
+            for cid in [c for c, (_, g) in self._deadlines.items() if g == guild_id]:
+                del self._deadlines[cid]
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    def next_deadline(self, guild_id: int = None):
+        """Earliest deadline of one guild, or of every guild when guild_id is None."""
+        if guild_id is None:
+            heads = [ts for ts in (self.next_deadline(g) for g in list(self._heaps)) if ts is not None]
+            return min(heads) if heads else None
+        heap = self._heaps.get(guild_id)
+        while heap:
+            ts, cid = heap[0]
+            cur = self._deadlines.get(cid)
+            if cur is None or cur[1] != guild_id:
+                heapq.heappop(heap)
+                continue
+            if cur[0] > ts:
+                # stale (channel rescheduled later) -> move it to its real deadline
+                heapq.heapreplace(heap, (cur[0], cid))
+                continue
+            return ts
+        self._heaps.pop(guild_id, None)
+        return None
+
+    def pop_due(self, guild_id: int, now_ts: float):
+        """Return the cids of this guild whose deadline has passed, removing them from the schedule."""
+        due = []
+        while True:
+            ts = self.next_deadline(guild_id)
+            if ts is None or ts > now_ts:
+                break
+            _, cid = heapq.heappop(self._heaps[guild_id])
+            del self._deadlines[cid]
+            due.append(cid)
+        return due
+
+    async def _scan_guild(self, guild_id: int, cids: list, now: datetime):
+        try:
+            await scan_channels_concurrently(guild_id, cids, now)
+        finally:
+            guild_scan_tasks.pop(guild_id, None)
+            self._wake.set()
+
+    def _update_countdown(self, guild_id: int, now: datetime):
+        nd = self.next_deadline(guild_id)
+        if nd is not None:
+            guild_next_check[guild_id] = datetime.fromtimestamp(nd, timezone.utc)
+            return
+        # nothing scheduled (all confirmed / no monitors): keep a stable target one interval ahead
+        cur = guild_next_check.get(guild_id)
+        if cur is None or cur <= now:
+            guild_next_check[guild_id] = now + timedelta(seconds=guild_scan_interval(guild_id))
+
+    async def run(self):
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                for gid in list(self._heaps):
+                    if gid in guild_scan_tasks:
+                        # this guild's previous batch is still running; its due channels wait for it
+                        continue
+                    due = self.pop_due(gid, now.timestamp())
+                    if due:
+                        guild_scan_tasks[gid] = asyncio.create_task(self._scan_guild(gid, due, now))
+                for gid in config.get("guilds", {}):
+                    self._update_countdown(int(gid), now)
+                heads = [self.next_deadline(g) for g in list(self._heaps) if g not in guild_scan_tasks]
+                heads = [ts for ts in heads if ts is not None]
+                now_ts = datetime.now(timezone.utc).timestamp()
+                # never sleep longer than one scan interval, so unknown/untracked channels still get polled
+                sleep_for = CHECK_INTERVAL_SECONDS if not heads else min(CHECK_INTERVAL_SECONDS, max(0.0, min(heads) - now_ts))
+                self._sleep_until = now_ts + sleep_for
+                self._wake.clear()
+                try:
+                    # asyncio.timeout, not wait_for: wait_for (3.11) swallows a cancel() landing with _wake.set()
+                    async with asyncio.timeout(sleep_for):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+                self._sleep_until = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("Error in deadline scheduler:", e)
+                await asyncio.sleep(1)
+
+
+deadline_scheduler = DeadlineScheduler()
+
+
+def monitor_deadline(cid: int, rec: MonitorRecord, guild_id: int = None):
+    """
+    Earliest moment (epoch seconds) this monitor could need attention, or None when nothing
+    can happen until a new message arrives (confirmed alerts).
+    """
+    if rec is None or not rec.last_message_ts:
+        return time.time()
+    if EVENT_DRIVEN_TRACKING and cid not in activity_known:
+        # state unknown -> needs a history() poll
+        return time.time()
+    interval = monitor_scan_interval(cid, guild_id)
+    if not EVENT_DRIVEN_TRACKING:
+        # without gateway tracking new messages are only seen by polling
+        return time.time() + interval
+    if rec.confirmed:
+        return None
+    if rec.alert_sent_ts:
+        # repeat alerts keep the scan-interval cadence
+        return rec.alert_sent_ts + interval
+    return rec.last_message_ts + monitor_threshold(cid, guild_id) + 1
+
+
+def schedule_monitor(cid: int, guild_id: int, evaluated_at: datetime = None):
+    """
+    (Re)compute the deadline of one monitor. When the monitor was just evaluated and its deadline
+    is still in the past (no log channel, channel inaccessible, empty history...), back off to the
+    scan interval instead of spinning.
+    """
+    if SCAN_MODE != "deadline":
+        return
+    if guild_id is None or cid not in guild_monitored_list(guild_id):
+        deadline_scheduler.unschedule(cid)
+        return
+    when = monitor_deadline(cid, monitored.get(cid), guild_id)
+    if when is None:
+        deadline_scheduler.unschedule(cid)
+        return
+    if evaluated_at is not None and when <= evaluated_at.timestamp():
+        when = evaluated_at.timestamp() + monitor_scan_interval(cid, guild_id)
+    deadline_scheduler.schedule(cid, guild_id, when)
+
+
+def rebuild_schedule():
+    """Schedule every monitored channel of every configured guild (startup, interval change)."""
+    if SCAN_MODE != "deadline":
+        return
+    deadline_scheduler.clear()
+    for gid in config.get("guilds", {}):
+        reschedule_guild(int(gid))
+
+
+def reschedule_guild(guild_id: int):
+    """Recompute the deadlines of one guild (its interval/threshold changed)."""
+    if SCAN_MODE != "deadline":
+        return
+    deadline_scheduler.clear(int(guild_id))
+    for cid in guild_monitored_list(guild_id):
+        schedule_monitor(cid, int(guild_id))
+
+
+# ---------------- Core scanning logic (reused by check_loop & manual scan) ----------------
+async def reset_monitor_activity(cid: int, rec: MonitorRecord, last_ts: int, guild_id: int):
+    """
+    A new message was seen in a monitored channel: record its time (epoch seconds), clear alert/confirm
+    state and delete the outstanding alert (if any) from the log channel.
+    """
+    rec.last_message_ts = last_ts
+    rec.alert_count = 0
+    rec.confirmed = False
+    rec.confirmed_by = None
+
+    # delete old alert if existed and log channel known (batched with other deletions of that channel)
+    if rec.alert_message_id:
+        old_id = rec.alert_message_id
+        rec.alert_message_id = None
+        rec.alert_sent_ts = 0
+        release_alert_message(rec.log_channel or get_guild_log_channel(guild_id), old_id)
+    save_monitored(cid)
+    schedule_monitor(cid, guild_id)
+
+
+async def perform_scan_for_guild(guild: discord.Guild, cids: list = None):
+    """
+    Run one monitoring pass for a single guild (or only `cids` of it). Used by manual scan and when
+    check_loop runs.
+    """
+    now = datetime.now(timezone.utc)
+    gm_list = list(guild_monitored_list(guild.id)) if cids is None else cids
+    started = time.perf_counter()
+    await scan_channels_concurrently(guild.id, gm_list, now)
+    duration = time.perf_counter() - started
+    scan_stats[guild.id] = {"channels": len(gm_list), "duration": duration, "finished_at": datetime.now(timezone.utc)}
+    print(f"Scan guild {guild.id}: {len(gm_list)} channel(s) in {duration:.2f}s")
+
+
+async def scan_channels_concurrently(guild_id: int, cids: list, now: datetime):
+    """
+    Evaluate channels in parallel, bounded by SCAN_CONCURRENCY_PER_GUILD for this guild (across the manual
+    scan, check_loop and scheduler batches alike) and SCAN_CONCURRENCY_GLOBAL across every running scan.
+    """
+    guild_sem = get_guild_scan_semaphore(guild_id)
+
+    async def worker(cid):
+        async with guild_sem, scan_semaphore:
+            await scan_monitored_channel(cid, guild_id, now)
+
+    await asyncio.gather(*(worker(cid) for cid in cids), return_exceptions=True)
+
+
+def snowflake_ts(message_id: int):
+    """Epoch seconds a message id (snowflake) was created at — its top bits are ms since the Discord epoch."""
+    return ((message_id >> 22) + discord.utils.DISCORD_EPOCH) // 1000
+
+
+def cached_last_message_id(cid: int):
+    """
+    last_message_id of the gateway-cached channel (kept current by MESSAGE_CREATE), or None. Channels only
+    known through fetch_channel() (channel_cache) are snapshots, so they don't count.
+    """
+    if not SNOWFLAKE_ACTIVITY:
+        return None
+    ch = bot.get_channel(cid)
+    return getattr(ch, "last_message_id", None) if ch is not None else None
+
+
+async def scan_monitored_channel(cid: int, guild_id: int, now: datetime):
+    """
+    Evaluate a single monitored channel: pick up new activity, or send/repeat its alert when
+    it has been quiet for longer than its threshold (monitor_threshold). Afterwards its next deadline is scheduled.
+    """
+    try:
+        ch = await resolve_channel(cid)
+        rec = monitored.get(cid)
+        if EVENT_DRIVEN_TRACKING and rec is not None and cid in activity_known:
+            # kept up to date by on_message -> pure in-memory comparison, no REST call
+            last_ts = rec.last_message_ts
+        else:
+            last_id = cached_last_message_id(cid)
+            if last_id:
+                last_ts = snowflake_ts(last_id)
+                note_seen_message(cid, last_id)
+                perf_counters["snowflake_lookups"] += 1
+            else:
+                msgs = [m async for m in ch.history(limit=1)]
+                perf_counters["history_lookups"] += 1
+                if not msgs:
+                    return
+                last_ts = snowflake_ts(msgs[0].id)
+                note_seen_message(cid, msgs[0].id)
+            if EVENT_DRIVEN_TRACKING:
+                activity_known.add(cid)
+        if rec is None:
+            rec = monitored[cid] = MonitorRecord(last_ts)
+            save_monitored(cid)
+
+        # reset on new message
+        if not rec.last_message_ts or last_ts != rec.last_message_ts:
+            await reset_monitor_activity(cid, rec, last_ts, ch.guild.id)
+            return
+
+        # skip confirmed
+        if rec.confirmed:
+            return
+
+        threshold = monitor_threshold(cid, guild_id)
+        now_ts = now.timestamp()
+        if now_ts - rec.last_message_ts > threshold:
+            # avoid very-frequent double alerts (short window / alert still waiting in the dispatcher)
+            if rec.alert_sent_ts and now_ts - rec.alert_sent_ts < 5:
+                return
+            if alert_dispatcher.is_queued(cid):
+                return
+
+            rec.alert_count += 1
+            log_ch_id = rec.log_channel or get_guild_log_channel(ch.guild.id)
+            if not log_ch_id:
+                print(f"Skipping alert for {ch.name} (no log configured).")
+                return
+
+            alert_dispatcher.enqueue(log_ch_id, cid, ch.guild.id, ch.name, threshold, now)
+    except Exception as e:
+        print(f"Error monitoring {cid} in guild {guild_id}: {e}")
+    finally:
+        schedule_monitor(cid, guild_id, evaluated_at=now)
+        note_first_scan(cid)
+
+
+# ---------------- Alert dispatcher ----------------
+def release_alert_message(log_ch_id: int, message_id: int):
+    """Delete an alert message once no monitor (digests are shared) or preserved alert refers to it anymore."""
+    if not log_ch_id or not message_id:
+        return
+    if alert_message_refs.get(message_id):
+        return
+    deletion_scheduler.delete_message(log_ch_id, message_id, DELETION_BATCH_WINDOW_SECONDS)
 
 
-# ---------------- Core scanning logic (reused by check_loop & manual scan) ----------------
-async def perform_scan_for_guild(guild: discord.Guild):
+def alert_mentions():
+    mention_parts = []
+    if PING_EVERYONE:
+        mention_parts.append("@everyone")
+    if PING_ROLE_IDS:
+        mention_parts.extend(f"<@&{rid}>" for rid in PING_ROLE_IDS)
+    return " ".join(mention_parts) if mention_parts else None
+
+
+class AlertDispatcher:
     """
-    Run one monitoring pass for a single guild. Used by manual scan and when check_loop runs.
+    Per-log-channel alert queue. scan_monitored_channel only enqueues; one flush task per log channel
+    (holding its lock, i.e. its rate-limit bucket) sends what accumulated during ALERT_BATCH_WINDOW_SECONDS:
+    individual alerts for small batches, digest messages from ALERT_DIGEST_THRESHOLD on. Repeat alerts are
+    edited in place when ALERT_UPDATE_MODE is "edit" (see _editable). Superseded alert
+    messages are handed to the deletion scheduler (bulk-delete) instead of being fetched and deleted here.
     """
-    now = datetime.now(timezone.utc)
-    gm_list = guild_monitored_list(guild.id)
-    for cid in list(gm_list):
-        try:
-            ch = bot.get_channel(cid) or await bot.fetch_channel(cid)
-            msgs = [m async for m in ch.history(limit=1)]
-            if not msgs:
-                continue
-            last_msg_time = msgs[0].created_at.replace(tzinfo=timezone.utc)
-            rec = monitored.get(cid)
-            if rec is None:
-                monitored[cid] = {
-                    "log_channel": None,
-                    "last_message_time": last_msg_time,
-                    "alert_count": 0,
-                    "alert_message_id": None,
-                    "alert_sent_time": None,
-                    "confirmed": False,
-                    "confirmed_by": None
-                }
-                save_monitored()
-                rec = monitored[cid]
 
-            # reset on new message
-            if rec.get("last_message_time") is None or last_msg_time != rec.get("last_message_time"):
-                rec["last_message_time"] = last_msg_time
-                rec["alert_count"] = 0
-                rec["confirmed"] = False
-                rec["confirmed_by"] = None
-
-                # delete old alert if existed and log channel known
-                if rec.get("alert_message_id"):
-                    try:
-                        log_ch_id = rec.get("log_channel") or get_guild_log_channel(ch.guild.id)
-                        if log_ch_id:
-                            log_ch = bot.get_channel(log_ch_id) or await bot.fetch_channel(log_ch_id)
-                            old = await log_ch.fetch_message(rec.get("alert_message_id"))
-                            try:
-                                await old.delete()
-                            except:
-                                pass
-                    except Exception:
-                        pass
-                    rec["alert_message_id"] = None
-                    rec["alert_sent_time"] = None
-                save_monitored()
+    def __init__(self):
+        self._queues = {}   # log_ch_id -> {cid: (guild_id, channel name, threshold, scan time)}
+        self._queued = {}   # cid -> log_ch_id
+        self._tasks = {}    # log_ch_id -> flush task
+        self.sent_single = 0
+        self.sent_digest = 0
+        self.edited = 0
+
+    def is_queued(self, cid: int):
+        return cid in self._queued
+
+    def enqueue(self, log_ch_id: int, cid: int, guild_id: int, name: str, threshold: int, now: datetime):
+        self._queues.setdefault(log_ch_id, {})[cid] = (guild_id, name, threshold, now)
+        self._queued[cid] = log_ch_id
+        task = self._tasks.get(log_ch_id)
+        if task is None or task.done():
+            self._tasks[log_ch_id] = asyncio.create_task(self._flush_later(log_ch_id))
+
+    async def _flush_later(self, log_ch_id: int):
+        await asyncio.sleep(ALERT_BATCH_WINDOW_SECONDS)
+        # alerts queued while a batch is being sent are picked up by the next round
+        while self._queues.get(log_ch_id):
+            items = self._queues.pop(log_ch_id)
+            for cid in items:
+                self._queued.pop(cid, None)
+            try:
+                async with get_log_channel_lock(log_ch_id):
+                    await self._send(log_ch_id, items)
+            except Exception as e:
+                print(f"Error dispatching alerts to {log_ch_id}: {e}")
+
+    async def _send(self, log_ch_id: int, items: dict):
+        # drop alerts that became moot while queued (new activity, confirmed, monitor removed)
+        due = []
+        for cid, (gid, name, threshold, now) in items.items():
+            rec = monitored.get(cid)
+            if rec is None or rec.confirmed or not rec.last_message_ts:
                 continue
-
-            # skip confirmed
-            if rec.get("confirmed"):
+            if time.time() - rec.last_message_ts <= threshold:
                 continue
+            due.append((cid, gid, name, threshold, now, rec))
+        if not due:
+            return
+        try:
+            log_ch = await resolve_channel(log_ch_id)
+        except Exception as e:
+            print(f"Cannot access log channel {log_ch_id} for {len(due)} alert(s): {e}")
+            return
+        if ALERT_UPDATE_MODE == "edit":
+            fresh = []
+            for item in due:
+                if not (self._editable(item[5]) and await self._edit_single(log_ch, *item)):
+                    fresh.append(item)
+            due = fresh
+            if not due:
+                return
+        if len(due) < ALERT_DIGEST_THRESHOLD:
+            for item in due:
+                await self._send_single(log_ch, *item)
+            return
+        for i in range(0, len(due), ALERT_DIGEST_MAX_CHANNELS):
+            await self._send_digest(log_ch, due[i:i + ALERT_DIGEST_MAX_CHANNELS])
+
+    @staticmethod
+    def _alert_embed(name, threshold, now, rec):
+        diff = now.timestamp() - rec.last_message_ts
+        embed = discord.Embed(
+            title=f"👉**{name}**👈 quá {threshold//60} phút chưa xong Mission.",
+            color=0xE74C3C,
+            timestamp=now
+        )
+        embed.add_field(name="Last message", value=local_time_str(rec.last_message_time), inline=True)
+        embed.add_field(name="Delay", value=format_seconds(diff), inline=True)
+        embed.add_field(name="Thông báo lần", value=str(rec.alert_count), inline=True)
+        return embed
 
-            diff = (now - rec["last_message_time"]).total_seconds()
-            if diff > THRESHOLD_SECONDS:
-                # avoid very-frequent double alerts (short window)
-                if rec.get("alert_sent_time") and (now - rec["alert_sent_time"]).total_seconds() < 5:
-                    continue
+    @staticmethod
+    def _editable(rec):
+        """A repeat alert can be edited in place if the channel owns its alert message and no fresh ping is due."""
+        mid = rec.alert_message_id
+        if not mid:
+            return False
+        if ALERT_REPING_EVERY and (rec.alert_count - 1) % ALERT_REPING_EVERY == 0:
+            return False
+        # digest messages are shared by several channels (or still back a preserved alert)
+        return alert_message_refs.get(mid, 0) <= 1
+
+    async def _edit_single(self, log_ch, cid, guild_id, name, threshold, now, rec):
+        embed = self._alert_embed(name, threshold, now, rec)
+        try:
+            await log_ch.get_partial_message(rec.alert_message_id).edit(embed=embed)
+        except discord.NotFound:
+            # alert was deleted by hand -> send a new one
+            rec.alert_message_id = None
+            return False
+        except Exception as e:
+            print(f"Failed to edit alert for {cid} in {log_ch.id}: {e}")
+            return False
+        self.edited += 1
+        rec.alert_sent_ts = int(now.timestamp())
+        schedule_monitor(cid, guild_id)
+        save_monitored(cid)
+        print(f"Alert {rec.alert_count} - {name} -> updated in {log_ch.id}")
+        return True
 
-                rec["alert_count"] = rec.get("alert_count", 0) + 1
-                log_ch_id = rec.get("log_channel") or get_guild_log_channel(ch.guild.id)
-                if not log_ch_id:
-                    print(f"Skipping alert for {ch.name} (no log configured).")
-                    continue
+    async def _send_single(self, log_ch, cid, guild_id, name, threshold, now, rec):
+        embed = self._alert_embed(name, threshold, now, rec)
+        try:
+            sent = await send_in_log_channel(log_ch, content=alert_mentions(), embed=embed, view=ConfirmView(cid), persistent=True)
+        except Exception as e:
+            print(f"Failed to send alert for {cid} to {log_ch.id}: {e}")
+            return
+        if sent:
+            self.sent_single += 1
+            self._record_sent(log_ch.id, [(cid, guild_id, rec)], sent.id, now)
+            print(f"Alert {rec.alert_count} - {name} -> sent to {log_ch.id}")
+
+    async def _send_digest(self, log_ch, chunk):
+        now = chunk[0][4]
+        embed = discord.Embed(
+            title=f"🚨 {len(chunk)} channel quá ngưỡng chưa xong Mission.",
+            color=0xE74C3C,
+            timestamp=now
+        )
+        lines = []
+        options = []
+        for cid, gid, name, threshold, _, rec in chunk:
+            diff = now.timestamp() - rec.last_message_ts
+            lines.append(f"👉**{name}** • {local_time_str(rec.last_message_time)} • {format_seconds(diff)} • lần {rec.alert_count}")
+            options.append(discord.SelectOption(label=f"#{name}"[:100], value=str(cid), description=f"Delay {format_seconds(diff)}"[:100]))
+        embed.description = "\n".join(lines)[:4096]
+        try:
+            sent = await send_in_log_channel(log_ch, content=alert_mentions(), embed=embed, view=DigestConfirmView(options), persistent=True)
+        except Exception as e:
+            print(f"Failed to send alert digest to {log_ch.id}: {e}")
+            return
+        if sent:
+            self.sent_digest += 1
+            self._record_sent(log_ch.id, [(cid, gid, rec) for cid, gid, _, _, _, rec in chunk], sent.id, now)
+            print(f"Alert digest ({len(chunk)} channel) -> sent to {log_ch.id}")
 
-                try:
-                    log_ch = bot.get_channel(log_ch_id) or await bot.fetch_channel(log_ch_id)
-                except Exception as e:
-                    print(f"Cannot access log channel {log_ch_id} for monitor {cid}: {e}")
-                    continue
+    def _record_sent(self, log_ch_id: int, entries, message_id: int, now: datetime):
+        superseded = set()
+        for cid, gid, rec in entries:
+            if rec.alert_message_id:
+                superseded.add(rec.alert_message_id)
+            rec.alert_message_id = message_id
+            rec.alert_sent_ts = int(now.timestamp())
+            schedule_monitor(cid, gid)
+        save_monitored(*[cid for cid, _, _ in entries])
+        for old_id in superseded:
+            release_alert_message(log_ch_id, old_id)
 
-                # delete old alert if exists
-                if rec.get("alert_message_id"):
-                    try:
-                        old = await log_ch.fetch_message(rec["alert_message_id"])
-                        try:
-                            await old.delete()
-                        except:
-                            pass
-                    except:
-                        pass
 
-                embed = discord.Embed(
-                    title=f"👉**{ch.name}**👈 quá {THRESHOLD_SECONDS//60} phút chưa xong Mission.",
-                    color=0xE74C3C,
-                    timestamp=now
-                )
-                embed.add_field(name="Last message", value=local_time_str(rec["last_message_time"]), inline=True)
-                embed.add_field(name="Delay", value=format_seconds(diff), inline=True)
-                embed.add_field(name="Thông báo lần", value=str(rec["alert_count"]), inline=True)
-
-                mention_parts = []
-                if PING_EVERYONE:
-                    mention_parts.append("@everyone")
-                if PING_ROLE_IDS:
-                    mention_parts.extend(f"<@&{rid}>" for rid in PING_ROLE_IDS)
-                content = " ".join(mention_parts) if mention_parts else None
-                allowed = discord.AllowedMentions(everyone=bool(PING_EVERYONE),
-                                                  roles=bool(PING_ROLE_IDS),
-                                                  users=False)
-                view = ConfirmView(cid)
-                try:
-                    sent = await send_in_log_channel(log_ch, content=content, embed=embed, view=view, persistent=True)
-                    if sent:
-                        rec["alert_message_id"] = sent.id
-                        rec["alert_sent_time"] = now
-                        save_monitored()
-                        print(f"Alert {rec['alert_count']} - {ch.name} -> sent to {log_ch.id}")
-                except Exception as e:
-                    print(f"Failed to send alert for {cid} to {log_ch_id}: {e}")
-        except Exception as e:
-            print(f"Error monitoring {cid} in guild {guild.id}: {e}")
+alert_dispatcher = AlertDispatcher()
 
 
 # ---------------- Confirm View (alerts in log channel) ----------------
@@ -753,13 +2205,15 @@ class ConfirmView(discord.ui.View):
             return
 
         cid = self.monitor_cid
-        guild_id = None
-        try:
-            chobj = bot.get_channel(cid) or (await bot.fetch_channel(cid) if cid else None)
-            if chobj and getattr(chobj, "guild", None):
-                guild_id = chobj.guild.id
-        except Exception:
-            guild_id = interaction.guild.id if interaction.guild else None
+        if cid is None and interaction.message is not None:
+            # persistent fallback after a restart: find the monitor that owns this alert message
+            mid = interaction.message.id
+            cid = next((c for c, r in monitored.items() if r.alert_message_id == mid), None) or \
+                next((c for c, p in preserved_alerts.items() if p.get("alert_message_id") == mid), None)
+        # reverse index; preserved alerts (monitor removed) fall back to the guild the button was pressed in
+        guild_id = monitor_guild_id(cid) if cid else None
+        if guild_id is None and interaction.guild:
+            guild_id = interaction.guild.id
 
         lock = get_guild_lock(guild_id) if guild_id else asyncio.Lock()
 
@@ -783,16 +2237,17 @@ class ConfirmView(discord.ui.View):
                 preserved["confirmed"] = True
                 preserved["confirmed_by"] = user.id
             else:
-                if rec.get("confirmed"):
+                if rec.confirmed:
                     try:
-                        prev = rec.get("confirmed_by")
+                        prev = rec.confirmed_by
                         await interaction.response.send_message(f"❌ Đã được xác nhận bởi <@{prev}>.", ephemeral=True, delete_after=6)
                     except:
                         pass
                     return
-                rec["confirmed"] = True
-                rec["confirmed_by"] = user.id
-                save_monitored()
+                rec.confirmed = True
+                rec.confirmed_by = user.id
+                save_monitored(cid)
+                schedule_monitor(cid, guild_id)
 
         try:
             for item in self.children:
@@ -819,6 +2274,67 @@ class ConfirmView(discord.ui.View):
                 pass
 
 
+class DigestConfirmView(discord.ui.View):
+    """
+    Confirm selection of a digest alert. Persistent: the selected option values are the channel ids,
+    so the generic instance registered in on_ready can handle digests sent before a restart.
+    """
+
+    def __init__(self, options: list = None):
+        super().__init__(timeout=None)
+        options = options or [discord.SelectOption(label="—", value="0")]
+        self.select = discord.ui.Select(custom_id="digest_confirm_select", placeholder="✅ Confirm channel...",
+                                        min_values=1, max_values=len(options), options=options)
+        self.select.callback = self.on_select
+        self.add_item(self.select)
+
+    async def on_select(self, interaction: discord.Interaction):
+        user = interaction.user
+        if not (user.guild_permissions.manage_channels or user.guild_permissions.administrator):
+            try:
+                await interaction.response.send_message("❌ Bạn không có quyền xác nhận.", ephemeral=True, delete_after=5)
+            except:
+                pass
+            return
+        guild_id = interaction.guild.id if interaction.guild else None
+        confirmed, done = [], set()
+        async with (get_guild_lock(guild_id) if guild_id else asyncio.Lock()):
+            for v in self.select.values:
+                cid = int(v)
+                rec = monitored.get(cid)
+                done.add(cid)
+                if rec is None or rec.confirmed:
+                    continue
+                rec.confirmed = True
+                rec.confirmed_by = user.id
+                confirmed.append(cid)
+                schedule_monitor(cid, guild_id)
+            if confirmed:
+                save_monitored(*confirmed)
+
+        try:
+            remaining = []
+            for row in interaction.message.components:
+                for comp in getattr(row, "children", []):
+                    if getattr(comp, "custom_id", None) == "digest_confirm_select":
+                        remaining = [o for o in comp.options if int(o.value) not in done]
+            view = DigestConfirmView(remaining)
+            if not remaining:
+                view.select.disabled = True
+                view.select.placeholder = "✅ Đã xác nhận tất cả"
+            embeds = interaction.message.embeds
+            new_e = discord.Embed.from_dict(embeds[0].to_dict()) if embeds else discord.Embed(title="Confirmed")
+            if confirmed:
+                names = ", ".join(f"<#{c}>" for c in confirmed)
+                new_e.add_field(name="✅ Confirmed by", value=f"{user.mention}: {names}"[:1024], inline=False)
+            await interaction.response.edit_message(embed=new_e, view=view)
+        except Exception:
+            try:
+                await interaction.response.send_message(f"✅ Đã xác nhận {len(confirmed)} channel bởi {user.mention}", ephemeral=True, delete_after=8)
+            except:
+                pass
+
+
 # ---------------- Remaining UI, Add/Remove/SetLog/List/MassCreate Views & Commands ----------------
 # (Implementations are the same as prior but use ensure_remaining_message_for_guild to avoid duplicates)
 
@@ -842,7 +2358,7 @@ class RemoveSelectView(discord.ui.View):
         gm_list = guild_monitored_list(self.guild.id)
         opts = []
         if options is None:
-            for cid in gm_list:
+            for cid in sorted(gm_list):
                 ch = self.guild.get_channel(cid)
                 if ch:
                     kind = "voice" if isinstance(ch, discord.VoiceChannel) else "text"
@@ -898,6 +2414,19 @@ class RemoveSelectView(discord.ui.View):
             except:
                 pass
 
+    @discord.ui.button(label="📦 Hàng loạt", style=discord.ButtonStyle.secondary, custom_id="remove_bulk")
+    async def bulk_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("❌ Bạn không có quyền.", ephemeral=True, delete_after=5)
+            return
+        try:
+            await interaction.response.send_modal(BulkMonitorModal(add=False))
+        except Exception as e:
+            try:
+                await interaction.response.send_message(f"Không thể mở modal: {e}", ephemeral=True, delete_after=6)
+            except:
+                pass
+
     @discord.ui.button(label="🔎 Search", style=discord.ButtonStyle.secondary, custom_id="remove_search")
     async def search_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
@@ -921,7 +2450,7 @@ class RemoveSelectView(discord.ui.View):
                     return
                 matches = []
                 gm_list = guild_monitored_list(self.parent_view.guild.id)
-                for cid in gm_list:
+                for cid in sorted(gm_list):
                     ch = self.parent_view.guild.get_channel(cid)
                     if not ch:
                         continue
@@ -990,17 +2519,17 @@ class RemoveSelectView(discord.ui.View):
 
         if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
             msg = await interaction.followup.send("❌ Bạn không có quyền thực hiện thao tác này.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         if getattr(self, "no_options", False):
             msg = await interaction.followup.send("Không có channel nào đang được theo dõi trong server này.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         if not getattr(self, "selected", None):
             msg = await interaction.followup.send("❗ Hãy chọn ít nhất 1 channel trước khi bấm Delete.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         lock = get_guild_lock(self.guild.id)
@@ -1015,28 +2544,27 @@ class RemoveSelectView(discord.ui.View):
                     already_missing.append(cid)
                     continue
                 remove_guild_monitored(self.guild.id, cid)
-                rec = monitored.pop(cid, None)
-                if rec and rec.get("alert_message_id"):
-                    log_ch_id = rec.get("log_channel") or get_guild_log_channel(self.guild.id)
+                deadline_scheduler.unschedule(cid)
+                rec = pop_monitor(cid)
+                if rec and rec.alert_message_id:
+                    log_ch_id = rec.log_channel or get_guild_log_channel(self.guild.id)
                     if log_ch_id:
                         try:
-                            log_ch = bot.get_channel(log_ch_id) or await bot.fetch_channel(log_ch_id)
-                            old = await log_ch.fetch_message(rec.get("alert_message_id"))
+                            log_ch = await resolve_channel(log_ch_id)
+                            old = await log_ch.fetch_message(rec.alert_message_id)
                             alert_time = old.created_at if getattr(old, 'created_at', None) else None
                             if alert_time and alert_time.tzinfo is None:
                                 alert_time = alert_time.replace(tzinfo=timezone.utc)
-                            if alert_time and (now - alert_time).total_seconds() > CHECK_INTERVAL_SECONDS:
-                                preserved_alerts[cid] = {"log_channel": log_ch.id, "alert_message_id": old.id, "alert_sent_time": alert_time}
+                            if alert_time and (now - alert_time).total_seconds() > monitor_scan_interval(cid, self.guild.id):
+                                preserve_alert(cid, log_ch.id, old.id, alert_time)
                                 preserved.append(cid)
                             else:
-                                try:
-                                    await old.delete()
-                                except:
-                                    pass
+                                release_alert_message(log_ch.id, old.id)
                         except Exception:
                             pass
                 added_removed.append(cid)
-            save_monitored()
+            if added_removed:
+                save_monitored(*added_removed)
 
         lines = []
         if added_removed:
@@ -1051,11 +2579,11 @@ class RemoveSelectView(discord.ui.View):
 
         try:
             msg = await interaction.followup.send(embed=embed, ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
         except:
             try:
                 msg = await interaction.followup.send(desc, ephemeral=True)
-                asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+                _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             except:
                 pass
 
@@ -1068,11 +2596,11 @@ class RemoveSelectView(discord.ui.View):
                 await interaction.followup.send("Đã hủy.", ephemeral=True)
             else:
                 await interaction.response.edit_message(content="Đã hủy.", embed=None, view=None)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
         except Exception:
             try:
                 await interaction.response.send_message("Đã hủy.", ephemeral=True)
-                asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+                _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
             except:
                 pass
         finally:
@@ -1156,6 +2684,19 @@ class AddSelectView(discord.ui.View):
             except:
                 pass
 
+    @discord.ui.button(label="📦 Hàng loạt", style=discord.ButtonStyle.secondary, custom_id="add_bulk")
+    async def bulk_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("❌ Bạn không có quyền.", ephemeral=True, delete_after=5)
+            return
+        try:
+            await interaction.response.send_modal(BulkMonitorModal(add=True))
+        except Exception as e:
+            try:
+                await interaction.response.send_message(f"Không thể mở modal: {e}", ephemeral=True, delete_after=6)
+            except:
+                pass
+
     @discord.ui.button(label="🔎 Search", style=discord.ButtonStyle.secondary, custom_id="add_search")
     async def search_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
@@ -1249,17 +2790,17 @@ class AddSelectView(discord.ui.View):
 
         if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
             msg = await interaction.followup.send("❌ Bạn không có quyền thực hiện thao tác này.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         if getattr(self, "no_options", False):
             msg = await interaction.followup.send("Không còn channel nào khả dụng để thêm vào monitor.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         if not getattr(self, "selected", None):
             msg = await interaction.followup.send("❗ Hãy chọn ít nhất 1 channel trước khi bấm Add.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         lock = get_guild_lock(self.guild.id)
@@ -1273,31 +2814,21 @@ class AddSelectView(discord.ui.View):
                     already_existed.append(cid)
                     continue
                 try:
-                    ch = self.guild.get_channel(cid) or await bot.fetch_channel(cid)
+                    ch = await resolve_channel(cid)
                 except Exception:
                     failed.append((cid, "Không thể truy cập channel"))
                     continue
-                last_msg_time = None
                 try:
                     msgs = [m async for m in ch.history(limit=1)]
-                    if msgs:
-                        last_msg_time = msgs[0].created_at.replace(tzinfo=timezone.utc)
-                    else:
-                        last_msg_time = datetime.now(timezone.utc)
+                    last_ts = snowflake_ts(msgs[0].id) if msgs else int(time.time())
                 except Exception:
-                    last_msg_time = datetime.now(timezone.utc)
-                monitored[cid] = {
-                    "log_channel": None,
-                    "last_message_time": last_msg_time,
-                    "alert_count": 0,
-                    "alert_message_id": None,
-                    "alert_sent_time": None,
-                    "confirmed": False,
-                    "confirmed_by": None
-                }
+                    last_ts = int(time.time())
+                monitored[cid] = MonitorRecord(last_ts)
                 add_guild_monitored(self.guild.id, cid)
+                schedule_monitor(cid, self.guild.id)
                 added.append(cid)
-            save_monitored()
+            if added:
+                save_monitored(*added)
 
         parts = []
         if added:
@@ -1312,11 +2843,11 @@ class AddSelectView(discord.ui.View):
 
         try:
             msg = await interaction.followup.send(embed=embed, ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
         except:
             try:
                 msg = await interaction.followup.send(desc, ephemeral=True)
-                asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+                _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             except:
                 pass
 
@@ -1329,11 +2860,11 @@ class AddSelectView(discord.ui.View):
                 await interaction.followup.send("Đã hủy.", ephemeral=True)
             else:
                 await interaction.response.edit_message(content="Đã hủy.", embed=None, view=None)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
         except Exception:
             try:
                 await interaction.response.send_message("Đã hủy.", ephemeral=True)
-                asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+                _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
             except:
                 pass
         finally:
@@ -1486,21 +3017,21 @@ class SetLogView(discord.ui.View):
             pass
         if interaction.user.id != self.requester.id and not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
             msg = await interaction.followup.send("❌ Bạn không có quyền.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
         if getattr(self, "no_options", False):
             msg = await interaction.followup.send("Không có channel để chọn.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
         if not self.selected_log:
             msg = await interaction.followup.send("❗ Hãy chọn log channel trước khi bấm Set.", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
         try:
-            _ = self.guild.get_channel(self.selected_log) or await bot.fetch_channel(self.selected_log)
+            _ = await resolve_channel(self.selected_log)
         except Exception as e:
             msg = await interaction.followup.send(f"❌ Không thể truy cập log channel đã chọn: {e}", ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
             return
 
         prev_log_id = get_guild_log_channel(self.guild.id)
@@ -1513,7 +3044,7 @@ class SetLogView(discord.ui.View):
         # including the previous remaining message. Attempt bulk purge first, fallback to manual deletion.
         if prev_log_id and prev_log_id != self.selected_log:
             try:
-                prev_ch = bot.get_channel(prev_log_id) or await bot.fetch_channel(prev_log_id)
+                prev_ch = await resolve_channel(prev_log_id)
                 # try bulk purge (best-effort)
                 try:
                     # purge will attempt to bulk-delete recent messages (requires Manage Messages)
@@ -1542,163 +3073,669 @@ class SetLogView(discord.ui.View):
         except Exception as e:
             print(f"Error ensuring remaining message for guild {self.guild.id}: {e}")
 
-        desc = f"✅ Đã gán log cho server: <#{self.selected_log}>.\n(Lưu ý: log là cấu hình cấp server, không gán cho từng monitor.)"
-        embed = discord.Embed(title="Set log", description=desc, color=0x2ECC71, timestamp=datetime.now(timezone.utc))
+        desc = f"✅ Đã gán log cho server: <#{self.selected_log}>.\n(Lưu ý: log là cấu hình cấp server, không gán cho từng monitor.)"
+        embed = discord.Embed(title="Set log", description=desc, color=0x2ECC71, timestamp=datetime.now(timezone.utc))
+        try:
+            msg = await interaction.followup.send(embed=embed, ephemeral=True)
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
+        except:
+            try:
+                msg = await interaction.followup.send(desc, ephemeral=True)
+                _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
+            except:
+                pass
+        self.selected_log = None
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, custom_id="setlog_cancel")
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send("Đã hủy.", ephemeral=True)
+            else:
+                await interaction.response.edit_message(content="Đã hủy.", embed=None, view=None)
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
+        except Exception:
+            try:
+                await interaction.response.send_message("Đã hủy.", ephemeral=True)
+                _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
+            except:
+                pass
+        finally:
+            self.stop()
+
+
+class MassCreateModal(discord.ui.Modal, title="Create multiple channels"):
+    base_name = discord.ui.TextInput(label="Base name (optional)", placeholder="<YOUR BASE NAME> <START INDEX>", required=False, max_length=100)
+    count = discord.ui.TextInput(label="Count", required=True, max_length=6)
+    chan_type = discord.ui.TextInput(label="Channel type", placeholder="text or voice (+monitor: theo dõi luôn)", required=False, max_length=20)
+    start = discord.ui.TextInput(label="Start index", placeholder="Channel's numberic start from <START INDEX>", required=False, max_length=6)
+    category = discord.ui.TextInput(label="Category (mention or id)", placeholder="PASTE <CATEROGY ID>", required=False, max_length=100)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        user = interaction.user
+        if not (user.guild_permissions.manage_channels or user.guild_permissions.administrator):
+            try:
+                await interaction.response.send_message("Bạn cần quyền Manage Channels.", ephemeral=True)
+                _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
+            except:
+                pass
+            return
+        base_name = (self.base_name.value or "").strip()
+        try:
+            count = int(self.count.value.strip())
+        except:
+            await interaction.response.send_message("Count không hợp lệ.", ephemeral=True)
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
+            return
+        chan_type = (self.chan_type.value or "text").strip().lower()
+        monitor = "+monitor" in chan_type
+        chan_type = chan_type.replace("+monitor", "").strip() or "text"
+        try:
+            start = int((self.start.value or "1").strip())
+        except:
+            start = 1
+        padding = 0
+        category_arg = (self.category.value or "").strip()
+        category_id = parse_channel_argument(category_arg) if category_arg else None
+        if count <= 0 or count > 500:
+            await interaction.response.send_message("Count phải trong 1..500.", ephemeral=True)
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
+            return
+        notify_channel = interaction.channel or (interaction.guild.system_channel if interaction.guild else None)
+        if notify_channel is None:
+            try:
+                dm = await interaction.user.create_dm()
+                notify_channel = dm
+            except:
+                notify_channel = None
+        try:
+            await interaction.response.send_message("⏳ Yêu cầu được nhận, sẽ báo khi hoàn thành.", ephemeral=True)
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
+        except:
+            pass
+        asyncio.create_task(do_masscreate(interaction.guild, notify_channel, base_name, count, chan_type, start, padding, category_id, user, monitor=monitor))
+
+
+# ---------------- Bulk channel jobs (create / delete / rename / move / monitor) ----------------
+BULK_JOB_OPS = {"create": "tạo", "delete": "xoá", "rename": "đổi tên", "move": "chuyển category", "monitor": "thêm vào monitor"}
+
+
+RANGE_SELECTOR_RE = re.compile(r"^(.*?)(\d+)\s*\.\.\s*(.*?)(\d+)$")
+
+
+def channel_name_matcher(pattern: str):
+    """
+    Name predicate for a bulk selector:
+      re:<regex>           regular expression, searched case-insensitively
+      base-001..base-300   numeric range on the trailing number (base-1..300 works too; padding is ignored)
+      anything else        glob pattern (base-0*); a plain name only matches itself
+    Raises ValueError for an invalid regex or range.
+    """
+    if pattern.startswith("re:"):
+        try:
+            rx = re.compile(pattern[3:], re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"regex không hợp lệ: {e}")
+        return lambda name: rx.search(name) is not None
+    m = RANGE_SELECTOR_RE.match(pattern)
+    if m and "*" not in pattern and "?" not in pattern:
+        prefix, lo, prefix2, hi = m.group(1), int(m.group(2)), m.group(3), int(m.group(4))
+        if prefix2 and prefix2.lower() != prefix.lower():
+            raise ValueError("hai đầu của khoảng phải cùng tiền tố (vd. base-001..base-300)")
+        if lo > hi:
+            lo, hi = hi, lo
+        rx = re.compile(re.escape(prefix) + r"(\d+)", re.IGNORECASE)
+
+        def in_range(name):
+            nm = rx.fullmatch(name)
+            return nm is not None and lo <= int(nm.group(1)) <= hi
+        return in_range
+    pattern = pattern.lower()
+    return lambda name: fnmatch.fnmatch(name.lower(), pattern)
+
+
+def bulk_targets(guild: discord.Guild, category_id: int = None, pattern: str = None):
+    """Channels of a category (or the whole guild) matching a selector (channel_name_matcher), in channel-list order."""
+    chans = [c for c in guild.channels
+             if not isinstance(c, discord.CategoryChannel) and (category_id is None or c.category_id == category_id)]
+    if pattern:
+        match = channel_name_matcher(pattern)
+        chans = [c for c in chans if match(c.name)]
+    return sorted(chans, key=lambda c: (c.position, c.id))
+
+
+def discord_channel_name(name: str, voice: bool = False):
+    """
+    The name Discord stores for a requested channel name: text channel names are lowercased, whitespace runs
+    become "-", punctuation other than "-" / "_" is dropped and repeated dashes collapse. Voice names are kept.
+    """
+    name = name.strip()
+    if voice:
+        return name
+    name = re.sub(r"\s+", "-", name.lower())
+    name = re.sub(r"[^\w-]", "", name)
+    return re.sub(r"-{2,}", "-", name)
+
+
+def forget_monitor(guild_id: int, cid: int):
+    """Drop a monitor whose channel is gone (its alert, if any, is released)."""
+    remove_guild_monitored(guild_id, cid)
+    deadline_scheduler.unschedule(cid)
+    activity_known.discard(cid)
+    rec = pop_monitor(cid)
+    if rec is None:
+        return
+    if rec.alert_message_id:
+        release_alert_message(rec.log_channel or get_guild_log_channel(guild_id), rec.alert_message_id)
+    save_monitored(cid)
+
+
+def enroll_monitor(guild_id: int, cid: int, last_ts: int):
+    """Register a monitor in memory only; callers persist a whole batch with one save_monitored()."""
+    monitored[cid] = MonitorRecord(last_ts)
+    add_guild_monitored(guild_id, cid)
+    schedule_monitor(cid, guild_id)
+
+
+def unenroll_monitor(guild_id: int, cid: int):
+    """
+    Drop a monitor in memory only (callers save). An alert older than the scan interval stays in the log as a
+    preserved alert, a fresh one is released. Returns True when the alert was preserved.
+    """
+    remove_guild_monitored(guild_id, cid)
+    deadline_scheduler.unschedule(cid)
+    activity_known.discard(cid)
+    rec = pop_monitor(cid)
+    if rec is None or not rec.alert_message_id:
+        return False
+    log_ch_id = rec.log_channel or get_guild_log_channel(guild_id)
+    if rec.alert_sent_ts and time.time() - rec.alert_sent_ts > monitor_scan_interval(cid, guild_id):
+        preserve_alert(cid, log_ch_id, rec.alert_message_id, rec.alert_sent_time)
+        return True
+    release_alert_message(log_ch_id, rec.alert_message_id)
+    return False
+
+
+async def apply_monitor_batch(guild: discord.Guild, channels: list, add: bool):
+    """
+    Add (or remove) many monitors in one pass under the guild lock, with a single save_monitored().
+    Channels that are already (or not) monitored are skipped. Returns (changed, skipped, preserved) id lists.
+    """
+    changed, skipped, preserved = [], [], []
+    async with get_guild_lock(guild.id):
+        gm = guild_monitored_list(guild.id)
+        for ch in channels:
+            if (ch.id in gm) == add:
+                skipped.append(ch.id)
+                continue
+            if add:
+                # latest known activity without a history() call: cached last message, else channel creation
+                enroll_monitor(guild.id, ch.id, snowflake_ts(getattr(ch, "last_message_id", None) or ch.id))
+            elif unenroll_monitor(guild.id, ch.id):
+                preserved.append(ch.id)
+            changed.append(ch.id)
+        if changed:
+            save_monitored(*changed)
+    return changed, skipped, preserved
+
+
+def channel_list_text(cids: list, limit: int = 20):
+    text = "\n".join(f"- <#{c}>" for c in cids[:limit])
+    if len(cids) > limit:
+        text += f"\n… và {len(cids) - limit} channel khác"
+    return text
+
+
+class BulkMonitorModal(discord.ui.Modal):
+    """Add / remove every channel matching a category and/or name selector — no 25-option select limit."""
+    category = discord.ui.TextInput(label="Category (trống = cả server)", placeholder="mention, id hoặc tên",
+                                    required=False, max_length=100)
+    pattern = discord.ui.TextInput(label="Tên: glob, re:<regex> hoặc khoảng", placeholder="base-0*  |  re:^base-\\d+$  |  base-001..base-300",
+                                   required=False, max_length=100)
+
+    def __init__(self, add: bool):
+        super().__init__(title="Thêm monitor hàng loạt" if add else "Xoá monitor hàng loạt")
+        self.add = add
+
+    async def on_submit(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        user = interaction.user
+        if not (user.guild_permissions.manage_channels or user.guild_permissions.administrator):
+            await interaction.response.send_message("Bạn cần quyền Manage Channels.", ephemeral=True, delete_after=5)
+            return
+        cat_arg = (self.category.value or "").strip()
+        pattern = (self.pattern.value or "").strip() or None
+        if not cat_arg and not pattern:
+            await interaction.response.send_message("❗ Hãy nhập category hoặc mẫu tên.", ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
+            return
+        category_id = None
+        if cat_arg:
+            cid = parse_channel_argument(cat_arg)
+            cat = guild.get_channel(cid) if cid else discord.utils.find(
+                lambda c: c.name.lower() == cat_arg.lower(), guild.categories)
+            if not isinstance(cat, discord.CategoryChannel):
+                await interaction.response.send_message("❌ category không hợp lệ.", ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
+                return
+            category_id = cat.id
+        try:
+            targets = bulk_targets(guild, category_id, pattern)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
+            return
+        if self.add:
+            log_ids = (get_guild_log_channel(guild.id), get_guild_ui_channel(guild.id))
+            targets = [c for c in targets if c.id not in log_ids]
+        try:
+            await interaction.response.defer(thinking=True, ephemeral=True)
+        except:
+            pass
+        changed, skipped, preserved = await apply_monitor_batch(guild, targets, self.add)
+
+        parts = []
+        if changed:
+            parts.append((f"✅ Đã thêm {len(changed)}:\n" if self.add else f"✅ Đã xóa {len(changed)}:\n") + channel_list_text(changed))
+        if skipped:
+            parts.append(f"⚠️ Bỏ qua {len(skipped)} channel " + ("đã được theo dõi." if self.add else "không được theo dõi."))
+        if preserved:
+            parts.append(f"ℹ️ Giữ lại {len(preserved)} alert đã quá cũ trong log.")
+        desc = "\n\n".join(parts) if parts else "Không có channel nào khớp."
+        embed = discord.Embed(title=("Add" if self.add else "Remove") + " monitors — Kết quả", description=desc,
+                              color=0x2ECC71 if self.add else 0xE74C3C, timestamp=datetime.now(timezone.utc))
+        try:
+            msg = await interaction.followup.send(embed=embed, ephemeral=True)
+            _delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS)
+        except:
+            pass
+
+
+class BulkJobRunner:
+    """
+    Applies one job's items in order. There are no fixed sleeps: a request only waits for what its route's
+    rate-limit headers (rate_limits) ask for — discord.py itself waits out 429s — and transient errors are
+    retried with exponential backoff. job["next"] is advanced (and saved) after every item.
+    """
+
+    # errors that would hit every remaining item too (max channels reached, missing permissions)
+    ABORT_CODES = (30013, 50013)
+
+    def __init__(self, guild: discord.Guild, job: dict):
+        self.guild = guild
+        self.job = job
+        self.category = None
+        self.reason = f"{job['op']} by {job['author']} ({job['author_id']})"
+        self.enrolled = []   # channel ids registered as monitors since the last progress save
+        self.maybe_sent = 0  # items below this index may have been created by an earlier run
+
+    async def _call(self, method: str, path: str, fn):
+        delay = BULK_BACKOFF_SECONDS
+        for attempt in range(BULK_MAX_RETRIES + 1):
+            wait = rate_limits.delay(method, path)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                return await fn()
+            except discord.RateLimited as e:
+                # only raised when the wait exceeds discord.py's max_ratelimit_timeout
+                retry_in = e.retry_after
+            except discord.HTTPException as e:
+                if e.status < 500 and e.status != 429:
+                    raise
+                retry_in = delay
+                delay *= 2
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                retry_in = delay
+                delay *= 2
+            if attempt == BULK_MAX_RETRIES:
+                break
+            perf_counters["bulk_retries"] += 1
+            await asyncio.sleep(retry_in)
+        raise RuntimeError(f"vẫn lỗi sau {BULK_MAX_RETRIES} lần thử lại")
+
+    def _channel(self, cid: int):
+        ch = self.guild.get_channel(int(cid))
+        if ch is None:
+            raise ValueError("không tìm thấy channel")
+        return ch
+
+    async def _mark_in_flight(self, index: int):
+        """Write ahead (and wait for the write) that items below job["in_flight"] may have been sent."""
+        job = self.job
+        if index < job.get("in_flight", 0):
+            return
+        job["in_flight"] = min(len(job["items"]), index + BULK_INFLIGHT_AHEAD)
+        save_config()
+        await persistence.flush()
+
+    async def _apply(self, index: int, item):
+        op = self.job["op"]
+        if op == "create":
+            parent = self.category.id if self.category else None
+            ch = None
+            created = self.job.setdefault("created", {})   # str(item index) -> created channel id
+            if index < self.maybe_sent:
+                # possibly created right before a restart: by recorded id, else by the name Discord stored
+                ch = self.guild.get_channel(created.get(str(index)) or 0)
+                if ch is None:
+                    name = discord_channel_name(item, voice=bool(self.job["params"].get("voice")))
+                    claimed = set(created.values())
+                    ch = next((c for c in self.guild.channels if c.name == name and c.category_id == parent
+                               and c.id not in claimed), None)
+            if ch is None:
+                await self._mark_in_flight(index)
+                create = self.guild.create_voice_channel if self.job["params"].get("voice") else self.guild.create_text_channel
+                ch = await self._call("POST", f"/guilds/{self.guild.id}/channels",
+                                      lambda: create(name=item, category=self.category, reason=self.reason))
+                perf_counters["channels_created"] += 1
+            created[str(index)] = ch.id
+            if self.job["params"].get("monitor"):
+                # last activity = creation time (the id's snowflake), no history() fetch
+                await self._enroll(ch.id, snowflake_ts(ch.id), known=True)
+        elif op == "delete":
+            ch = self.guild.get_channel(int(item))
+            if ch is None:
+                return
+            if ch.id in (get_guild_log_channel(self.guild.id), get_guild_ui_channel(self.guild.id)):
+                raise ValueError("channel log/UI được giữ lại")
+            await self._call("DELETE", f"/channels/{ch.id}", lambda: ch.delete(reason=self.reason))
+            if ch.id in monitored or ch.id in guild_monitored_list(self.guild.id):
+                forget_monitor(self.guild.id, ch.id)
+        elif op == "rename":
+            cid, name = item
+            ch = self._channel(cid)
+            if ch.name != name:
+                await self._call("PATCH", f"/channels/{ch.id}", lambda: ch.edit(name=name, reason=self.reason))
+        elif op == "move":
+            ch = self._channel(item)
+            if self.category is None:
+                raise ValueError("category đích không tồn tại")
+            if ch.category_id != self.category.id:
+                await self._call("PATCH", f"/channels/{ch.id}", lambda: ch.edit(category=self.category, reason=self.reason))
+        elif op == "monitor":
+            # !bulk monitor now applies as one batch (apply_monitor_batch); kept so persisted jobs still resume
+            ch = self._channel(item)
+            # latest known activity without a history() call: cached last message, else channel creation
+            last_id = getattr(ch, "last_message_id", None)
+            await self._enroll(ch.id, snowflake_ts(last_id or ch.id), known=False)
+
+    async def _enroll(self, cid: int, last_ts: int, known: bool):
+        """
+        Register a monitor under the guild lock; run() saves it together with the job's progress.
+        A channel that is a member but has no record (crash between the two writes) is enrolled again.
+        """
+        async with get_guild_lock(self.guild.id):
+            if cid in guild_monitored_list(self.guild.id) and cid in monitored:
+                return
+            if known and EVENT_DRIVEN_TRACKING:
+                # a channel we just created has no messages: on_message keeps it current from here on
+                activity_known.add(cid)
+            enroll_monitor(self.guild.id, cid, last_ts)
+            self.enrolled.append(cid)
+
+    def _save_progress(self):
+        # only marks state dirty: job progress, memberships and new records go out in the same debounced flush
+        save_config()
+        if self.enrolled:
+            save_monitored(*self.enrolled)
+            self.enrolled = []
+
+    async def run(self, on_progress):
+        job = self.job
+        category_id = job["params"].get("category_id")
+        if category_id:
+            try:
+                cat = await resolve_channel(category_id)
+                if isinstance(cat, discord.CategoryChannel):
+                    self.category = cat
+            except Exception:
+                self.category = None
+        # items a previous run may already have sent (persisted before their requests went out)
+        self.maybe_sent = job.get("in_flight", 0)
+        started = time.perf_counter()
+        elapsed_before = job.get("elapsed", 0.0)
+        items = job["items"]
+        try:
+            while job["next"] < len(items) and not job.get("cancelled"):
+                item = items[job["next"]]
+                try:
+                    await self._apply(job["next"], item)
+                    job["done"] += 1
+                except Exception as e:
+                    job["failed"] += 1
+                    if len(job["errors"]) < 5:
+                        job["errors"].append(f"{item}: {e}")
+                    if isinstance(e, discord.HTTPException) and e.code in self.ABORT_CODES:
+                        job["aborted"] = True
+                        job["next"] = len(items)
+                        break
+                job["next"] += 1
+                job["elapsed"] = elapsed_before + time.perf_counter() - started
+                self._save_progress()
+                await on_progress(job)
+        finally:
+            self._save_progress()
+        job["elapsed"] = elapsed_before + time.perf_counter() - started
+        return job
+
+
+class BulkJobQueue:
+    """
+    Persisted queue of bulk channel jobs (config["bulk_jobs"], saved after every item, resumed by on_ready).
+    Jobs of one guild run one at a time in submission order on that guild's worker task; guilds run in
+    parallel. Every job reports through one status message, edited at most every BULK_STATUS_EDIT_SECONDS,
+    whose Cancel button (BulkJobView) stops the job after the current item.
+    """
+
+    def __init__(self):
+        self._workers = {}   # guild_id -> worker task
+        self.totals = {}     # op -> [items done, seconds] over finished jobs (throughput metrics)
+
+    def jobs(self):
+        return config.setdefault("bulk_jobs", {})
+
+    def guild_jobs(self, guild_id: int):
+        return [(jid, job) for jid, job in self.jobs().items() if job["guild_id"] == guild_id]
+
+    async def submit(self, guild: discord.Guild, op: str, items: list, params: dict, author, notify_channel):
+        jobs = self.jobs()
+        job_id = format(int(time.time() * 1000), "x")
+        while job_id in jobs:
+            job_id = format(int(job_id, 16) + 1, "x")
+        job = {
+            "op": op, "guild_id": guild.id, "items": items, "params": params, "author": str(author),
+            "author_id": author.id, "notify_channel_id": getattr(notify_channel, "id", None), "status_message_id": None,
+            "next": 0, "done": 0, "failed": 0, "errors": [], "elapsed": 0.0, "cancelled": False,
+        }
+        jobs[job_id] = job
+        queued = len(self.guild_jobs(guild.id)) - 1
+        if notify_channel is not None:
+            try:
+                msg = await notify_channel.send(self.status_text(job_id, job, queued=queued), view=BulkJobView())
+                job["status_message_id"] = msg.id
+            except Exception as e:
+                print(f"Cannot post status of bulk job {job_id}: {e}")
+        save_config()
+        self._ensure_worker(guild.id)
+        return job_id
+
+    def cancel(self, job_id: str):
+        job = self.jobs().get(job_id)
+        if job is None or job.get("cancelled"):
+            return False
+        job["cancelled"] = True
+        save_config()
+        return True
+
+    def job_for_status_message(self, message_id: int):
+        return next((jid for jid, job in self.jobs().items() if job.get("status_message_id") == message_id), None)
+
+    def resume(self):
+        for gid in {job["guild_id"] for job in self.jobs().values()}:
+            self._ensure_worker(gid)
+
+    async def wait(self, guild_id: int):
+        task = self._workers.get(guild_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _ensure_worker(self, guild_id: int):
+        task = self._workers.get(guild_id)
+        if task is None or task.done():
+            self._workers[guild_id] = asyncio.create_task(self._worker(guild_id))
+
+    async def _worker(self, guild_id: int):
+        while True:
+            pending = self.guild_jobs(guild_id)
+            if not pending:
+                self._workers.pop(guild_id, None)
+                return
+            job_id, job = pending[0]
+            try:
+                await self._run(job_id, job)
+            except Exception as e:
+                print(f"Bulk job {job_id} failed: {e}")
+            self.jobs().pop(job_id, None)
+            save_config()
+
+    @staticmethod
+    def status_text(job_id: str, job: dict, queued: int = 0, final: bool = False):
+        total = len(job["items"])
+        rate = job["done"] / job["elapsed"] if job.get("elapsed") else 0.0
+        label = BULK_JOB_OPS.get(job["op"], job["op"])
+        if not final:
+            head = f"🕒 Job `{job_id}` ({label}) đang chờ {queued} job trước." if queued else f"⏳ Job `{job_id}` ({label})"
+            return f"{head} {job['done']}/{total} • lỗi {job['failed']} • {rate:.2f}/s"
+        if job.get("cancelled"):
+            head = f"⛔ Job `{job_id}` ({label}) đã huỷ."
+        elif job.get("aborted"):
+            head = f"❌ Job `{job_id}` ({label}) dừng giữa chừng."
+        else:
+            head = f"✅ Job `{job_id}` ({label}) hoàn thành."
+        text = f"{head} {job['done']}/{total} trong {job['elapsed']:.1f}s ({rate:.2f}/s)."
+        if job["failed"]:
+            text += f" Thất bại: {job['failed']}. Ví dụ: {job['errors'][:4]}"
+        return text
+
+    async def _status_message(self, job: dict):
+        if not (job.get("notify_channel_id") and job.get("status_message_id")):
+            return None
         try:
-            msg = await interaction.followup.send(embed=embed, ephemeral=True)
-            asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
-        except:
+            ch = await resolve_channel(job["notify_channel_id"])
+            return ch.get_partial_message(job["status_message_id"])
+        except Exception:
+            return None
+
+    async def _run(self, job_id: str, job: dict):
+        guild = bot.get_guild(job["guild_id"])
+        if guild is None:
+            return
+        status = await self._status_message(job)
+        last_edit = 0.0
+
+        async def on_progress(j):
+            nonlocal last_edit
+            if status is None or time.monotonic() - last_edit < BULK_STATUS_EDIT_SECONDS:
+                return
+            last_edit = time.monotonic()
             try:
-                msg = await interaction.followup.send(desc, ephemeral=True)
-                asyncio.create_task(_delete_message_obj_later(msg, UI_TEMP_DELETE_SECONDS))
-            except:
+                await status.edit(content=self.status_text(job_id, j))
+            except Exception:
                 pass
-        self.selected_log = None
 
-    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, custom_id="setlog_cancel")
-    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            if interaction.response.is_done():
-                await interaction.followup.send("Đã hủy.", ephemeral=True)
-            else:
-                await interaction.response.edit_message(content="Đã hủy.", embed=None, view=None)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
-        except Exception:
+        if not job.get("cancelled"):
+            if job["next"]:
+                print(f"Resuming bulk job {job_id} ({job['op']}) at {job['next']}/{len(job['items'])}")
+            await BulkJobRunner(guild, job).run(on_progress)
+        totals = self.totals.setdefault(job["op"], [0, 0.0])
+        totals[0] += job["done"]
+        totals[1] += job.get("elapsed", 0.0)
+        summary = self.status_text(job_id, job, final=True)
+        print(f"Bulk job {job_id}: {summary}")
+        if status is not None:
             try:
-                await interaction.response.send_message("Đã hủy.", ephemeral=True)
-                asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
-            except:
+                await status.edit(content=summary, view=None)
+                _delete_message_later(status.channel, status.id, UI_TEMP_DELETE_SECONDS)
+            except Exception:
                 pass
-        finally:
-            self.stop()
 
+    def rate(self, op: str):
+        done, seconds = self.totals.get(op, (0, 0.0))
+        return done / seconds if seconds else 0.0
 
-class MassCreateModal(discord.ui.Modal, title="Create multiple channels"):
-    base_name = discord.ui.TextInput(label="Base name (optional)", placeholder="<YOUR BASE NAME> <START INDEX>", required=False, max_length=100)
-    count = discord.ui.TextInput(label="Count", required=True, max_length=6)
-    chan_type = discord.ui.TextInput(label="Channel type", placeholder="text or voice channel", required=False, max_length=10)
-    start = discord.ui.TextInput(label="Start index", placeholder="Channel's numberic start from <START INDEX>", required=False, max_length=6)
-    category = discord.ui.TextInput(label="Category (mention or id)", placeholder="PASTE <CATEROGY ID>", required=False, max_length=100)
 
-    async def on_submit(self, interaction: discord.Interaction):
+bulk_jobs = BulkJobQueue()
+
+
+class BulkJobView(discord.ui.View):
+    """Cancel button under a bulk job's status message (persistent; the job is found by message id)."""
+
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="⛔ Huỷ", style=discord.ButtonStyle.danger, custom_id="bulk_job_cancel")
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         user = interaction.user
         if not (user.guild_permissions.manage_channels or user.guild_permissions.administrator):
             try:
-                await interaction.response.send_message("Bạn cần quyền Manage Channels.", ephemeral=True)
-                asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+                await interaction.response.send_message("❌ Bạn không có quyền huỷ job.", ephemeral=True, delete_after=5)
             except:
                 pass
             return
-        base_name = (self.base_name.value or "").strip()
-        try:
-            count = int(self.count.value.strip())
-        except:
-            await interaction.response.send_message("Count không hợp lệ.", ephemeral=True)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
-            return
-        chan_type = (self.chan_type.value or "text").strip().lower()
-        try:
-            start = int((self.start.value or "1").strip())
-        except:
-            start = 1
-        padding = 0
-        category_arg = (self.category.value or "").strip()
-        category_id = parse_channel_argument(category_arg) if category_arg else None
-        if count <= 0 or count > 500:
-            await interaction.response.send_message("Count phải trong 1..500.", ephemeral=True)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
-            return
-        notify_channel = interaction.channel or (interaction.guild.system_channel if interaction.guild else None)
-        if notify_channel is None:
-            try:
-                dm = await interaction.user.create_dm()
-                notify_channel = dm
-            except:
-                notify_channel = None
+        job_id = bulk_jobs.job_for_status_message(interaction.message.id) if interaction.message else None
+        if job_id and bulk_jobs.cancel(job_id):
+            msg = f"⛔ Đang huỷ job `{job_id}`..."
+        else:
+            msg = "Job đã kết thúc."
         try:
-            await interaction.response.send_message("⏳ Yêu cầu được nhận, sẽ báo khi hoàn thành.", ephemeral=True)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+            await interaction.response.send_message(msg, ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
         except:
             pass
-        asyncio.create_task(do_masscreate(interaction.guild, notify_channel, base_name, count, chan_type, start, padding, category_id, user))
 
 
-async def do_masscreate(guild, notify_channel, base_name, count, chan_type, start, padding, category_id, author):
-    created, failed = [], []
+async def do_masscreate(guild, notify_channel, base_name, count, chan_type, start, padding, category_id, author, monitor: bool = False):
+    """
+    Queue a create job for base_name-<start>..base_name-<start+count-1>; returns its job id.
+    monitor=True registers every created channel as a monitor right away (see BulkJobRunner._enroll).
+    """
     if padding <= 0:
         max_index = start + count - 1
         padding = len(str(max_index))
-    category_obj = None
-    if category_id:
-        try:
-            cat = guild.get_channel(category_id) or await bot.fetch_channel(category_id)
-            if isinstance(cat, discord.CategoryChannel):
-                category_obj = cat
-        except:
-            category_obj = None
-    progress_msg = None
-    try:
-        if notify_channel:
-            if base_name:
-                start_display = f"{base_name}-{start}"
-            else:
-                start_display = f"{start}"
-            progress_msg = await notify_channel.send(f"⏳ Bắt đầu tạo {count} channel (từ `{start_display}`)...")
-    except:
-        progress_msg = None
+    names = []
     for i in range(start, start + count):
         number_str = str(i).zfill(padding) if padding > 0 else str(i)
-        if base_name:
-            chan_name = f"{base_name}-{number_str}"
-        else:
-            chan_name = f"{number_str}"
-        try:
-            if chan_type.startswith('v'):
-                ch = await guild.create_voice_channel(name=chan_name, category=category_obj, reason=f"masscreate by {author} ({author.id})")
-            else:
-                ch = await guild.create_text_channel(name=chan_name, category=category_obj, reason=f"masscreate by {author} ({author.id})")
-            created.append(ch)
-            await asyncio.sleep(0.6)
-            if progress_msg and len(created) % 10 == 0:
-                try:
-                    await progress_msg.edit(content=f"⏳ Đã tạo {len(created)}/{count} channel...")
-                except:
-                    pass
-        except discord.HTTPException:
-            try:
-                await asyncio.sleep(2)
-                if chan_type.startswith('v'):
-                    ch = await guild.create_voice_channel(name=chan_name, category=category_obj, reason=f"retry")
-                else:
-                    ch = await guild.create_text_channel(name=chan_name, category=category_obj, reason=f"retry")
-                created.append(ch)
-            except Exception as e2:
-                failed.append((chan_name, str(e2)))
-                await asyncio.sleep(1)
-        except Exception as e:
-            failed.append((chan_name, str(e)))
-            await asyncio.sleep(0.5)
-    summary = f"✅ Hoàn thành. Tạo được {len(created)}/{count} channel."
-    if failed:
-        summary += f" Thất bại: {len(failed)}. Ví dụ: {failed[:4]}"
-    try:
-        if progress_msg:
-            try:
-                await progress_msg.edit(content=summary)
-            except:
-                await notify_channel.send(summary, delete_after=UI_TEMP_DELETE_SECONDS)
-            else:
-                asyncio.create_task(_delete_message_later(progress_msg.channel, progress_msg.id, UI_TEMP_DELETE_SECONDS))
-        elif notify_channel:
-            await notify_channel.send(summary, delete_after=UI_TEMP_DELETE_SECONDS)
-    except:
-        try:
-            await author.send(summary, delete_after=UI_TEMP_DELETE_SECONDS)
-        except:
-            pass
+        names.append(f"{base_name}-{number_str}" if base_name else number_str)
+    params = {"voice": chan_type.startswith("v"), "category_id": category_id, "monitor": monitor}
+    return await bulk_jobs.submit(guild, "create", names, params, author, notify_channel)
 
 
 # ---------------- ListMonitorsView & ConfigView (unchanged, keep same behaviour) ----------------
+# ---------------- Monitor list (cached sort keys / pages) ----------------
+FIRST_INT_RE = re.compile(r"\d+")
+
+
+def touch_monitor_list(guild_id: int, state_only: bool = False):
+    """
+    A guild's monitor list changed: membership or a channel name (every cached order is stale), or only
+    monitor state — activity, alerts, confirmations (only the state-sorted orders are).
+    """
+    if guild_id is None:
+        return
+    gens = monitor_list_gens.setdefault(guild_id, [0, 0])
+    gens[1] += 1
+    if not state_only:
+        gens[0] += 1
+
+
+def list_name_key(cid: int, ch):
+    """(name, name key, numeric key) of a monitor's channel, computed once per channel name."""
+    name = ch.name if ch else str(cid)
+    cached = list_name_keys.get(cid)
+    if cached is None or cached[0] != name:
+        low = name.lower()
+        m = FIRST_INT_RE.search(name)
+        cached = list_name_keys[cid] = (name, low, (0, int(m.group(0)), low) if m else (1, 0, low))
+    return cached
+
+
 class ListMonitorsView(discord.ui.View):
     SORT_OPTIONS = [
         ("name_asc", "Tên (A → Z)"),
@@ -1730,67 +3767,50 @@ class ListMonitorsView(discord.ui.View):
         self.sort_select.callback = self.on_sort_change
         self.add_item(self.sort_select)
 
+    STATE_SORTS = ("lastmsg_desc", "lastmsg_asc", "alerts_desc", "confirmed_first")
+
     def _rebuild_items(self):
+        """Snapshot the guild's monitors; sorted orders are cached until this guild's monitor_list_gens move."""
         g = self.guild
-        items = []
-        gm_list = guild_monitored_list(g.id)
-        for cid in gm_list:
-            try:
-                ch = g.get_channel(cid)
-            except:
-                ch = None
-            rec = monitored.get(cid)
-            items.append((cid, ch, rec))
-        self.items = items
+        self._gens = tuple(monitor_list_gens.get(g.id, (0, 0)))
+        self._snapshot = [(cid, g.get_channel(cid), monitored.get(cid)) for cid in guild_monitored_list(g.id)]
+        self._orders = {}
+        self._pages = {}
         self._apply_sort()
 
+    def _refresh(self):
+        gens = tuple(monitor_list_gens.get(self.guild.id, (0, 0)))
+        if gens[0] != self._gens[0]:
+            self._rebuild_items()
+        elif gens[1] != self._gens[1]:
+            # activity / alert changes only reorder the state sorts; name and numeric orders stay valid
+            self._gens = gens
+            for sort in self.STATE_SORTS:
+                self._orders.pop(sort, None)
+            self._apply_sort()
+        self.page = max(1, min(self.page, self.total_pages()))
+
+    @staticmethod
+    def _sort_key(sort: str):
+        """(key, reverse) for a sort option; name keys come from list_name_key (no per-sort lower() / regex)."""
+        if sort in ("name_asc", "name_desc"):
+            return (lambda t: list_name_key(t[0], t[1])[1]), sort == "name_desc"
+        if sort in ("lastmsg_desc", "lastmsg_asc"):
+            return (lambda t: t[2].last_message_ts if t[2] else 0), sort == "lastmsg_desc"
+        if sort == "alerts_desc":
+            return (lambda t: t[2].alert_count if t[2] else 0), True
+        if sort == "confirmed_first":
+            return (lambda t: not (t[2] and t[2].confirmed)), False
+        if sort in ("numeric_asc", "numeric_desc"):
+            return (lambda t: list_name_key(t[0], t[1])[2]), sort == "numeric_desc"
+        return (lambda t: list_name_key(t[0], t[1])[1]), False
+
     def _apply_sort(self):
-        def key_name(t):
-            cid, ch, rec = t
-            return (ch.name.lower() if ch else str(cid))
-        def key_lastmsg(t):
-            cid, ch, rec = t
-            dt = rec.get("last_message_time") if rec else None
-            return dt or datetime(1970, 1, 1, tzinfo=timezone.utc)
-        def key_alerts(t):
-            cid, ch, rec = t
-            return rec.get("alert_count", 0) if rec else 0
-        def key_confirmed_first(t):
-            cid, ch, rec = t
-            return not (rec and rec.get("confirmed"))
-        def extract_first_int(name: str):
-            if not name:
-                return None
-            m = re.search(r"\d+", name)
-            if not m:
-                return None
-            try:
-                return int(m.group(0))
-            except:
-                return None
-        if self.sort == "name_asc":
-            self.items.sort(key=key_name)
-        elif self.sort == "name_desc":
-            self.items.sort(key=key_name, reverse=True)
-        elif self.sort == "lastmsg_desc":
-            self.items.sort(key=key_lastmsg, reverse=True)
-        elif self.sort == "lastmsg_asc":
-            self.items.sort(key=key_lastmsg)
-        elif self.sort == "alerts_desc":
-            self.items.sort(key=key_alerts, reverse=True)
-        elif self.sort == "confirmed_first":
-            self.items.sort(key=key_confirmed_first)
-        elif self.sort in ("numeric_asc", "numeric_desc"):
-            def numeric_key(t):
-                cid, ch, rec = t
-                name = ch.name if ch else str(cid)
-                num = extract_first_int(name)
-                has_num = 0 if num is not None else 1
-                return (has_num, num if num is not None else 0, name.lower())
-            reverse = (self.sort == "numeric_desc")
-            self.items.sort(key=numeric_key, reverse=reverse)
-        else:
-            self.items.sort(key=key_name)
+        order = self._orders.get(self.sort)
+        if order is None:
+            key, reverse = self._sort_key(self.sort)
+            order = self._orders[self.sort] = sorted(self._snapshot, key=key, reverse=reverse)
+        self.items = order
 
     def total_pages(self):
         n = len(self.items)
@@ -1815,7 +3835,6 @@ class ListMonitorsView(discord.ui.View):
             new_opts.append(discord.SelectOption(label=lbl, value=v, default=(v == str(self.page_size))))
         self.size_select.options = new_opts
         self.size_select.placeholder = f"Page size: {self.page_size}"
-        self._rebuild_items()
         try:
             await interaction.response.edit_message(embed=self.build_embed(), view=self)
         except:
@@ -1886,7 +3905,7 @@ class ListMonitorsView(discord.ui.View):
                 await interaction.followup.send("Đã đóng danh sách.", ephemeral=True)
             else:
                 await interaction.response.edit_message(content="Đã đóng danh sách.", embed=None, view=None)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
         except Exception:
             try:
                 await interaction.response.send_message("Đã đóng danh sách.", ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
@@ -1895,20 +3914,36 @@ class ListMonitorsView(discord.ui.View):
         finally:
             self.stop()
 
+    def _page_signature(self):
+        """What a rendered page shows besides names: re-rendered only when one of its own rows changed."""
+        rows = tuple((cid, rec.last_message_ts, rec.alert_count, rec.confirmed, rec.log_channel) if rec else (cid,)
+                     for cid, ch, rec in self.current_page_items())
+        return rows, get_guild_log_channel(self.guild.id), len(self.items)
+
     def build_embed(self):
+        """Rendered pages are memoized per (sort, page size, page) and reused while their rows are unchanged."""
+        self._refresh()
+        key = (self.sort, self.page_size, self.page)
+        sig = self._page_signature()
+        cached = self._pages.get(key)
+        if cached is None or cached[0] != sig:
+            cached = self._pages[key] = (sig, self._render_page())
+        return cached[1]
+
+    def _render_page(self):
         total = len(self.items)
         pages = self.total_pages()
         cur_items = self.current_page_items()
         lines = []
         for cid, ch, rec in cur_items:
             name = ch.name if ch else f"(deleted channel {cid})"
-            lid_val = rec.get("log_channel") if rec else None
+            lid_val = rec.log_channel if rec else None
             if not lid_val:
                 lid_val = get_guild_log_channel(self.guild.id)
             lid_display = f"<#{lid_val}>" if lid_val else "—"
-            cnt = rec.get("alert_count", 0) if rec else 0
-            confirmed = "✅" if rec and rec.get("confirmed") else ""
-            last_msg = local_time_str(rec.get("last_message_time")) if rec and rec.get("last_message_time") else "—"
+            cnt = rec.alert_count if rec else 0
+            confirmed = "✅" if rec and rec.confirmed else ""
+            last_msg = local_time_str(rec.last_message_time) if rec and rec.last_message_ts else "—"
             lines.append(f"- <#{cid}> **{name}** {confirmed}\n  last: {last_msg} • alerts: {cnt} • log: {lid_display}")
         sort_label = dict(self.SORT_OPTIONS).get(self.sort, self.sort)
         desc = f"**Monitored channels:** {total} • Trang {self.page}/{pages} • Sắp xếp: {sort_label} • Page size: {self.page_size}\n\n" + ("\n\n".join(lines) if lines else "_Không có mục nào trên trang này._")
@@ -1966,7 +4001,7 @@ class ConfigView(discord.ui.View):
             except:
                 pass
             return
-        embed = discord.Embed(title="➕ Thêm monitor", description="Chọn các channel để thêm vào monitor (private với bạn), sau đó bấm **Add** hoặc **Cancel**.", color=0x2ECC71, timestamp=datetime.now(timezone.utc))
+        embed = discord.Embed(title="➕ Thêm monitor", description="Chọn các channel để thêm vào monitor (private với bạn), sau đó bấm **Add** hoặc **Cancel**.\n**📦 Hàng loạt**: thêm theo category / mẫu tên (không giới hạn 25).", color=0x2ECC71, timestamp=datetime.now(timezone.utc))
         try:
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             try:
@@ -1992,7 +4027,7 @@ class ConfigView(discord.ui.View):
             except:
                 pass
             return
-        embed = discord.Embed(title="🗑️ Xóa monitor", description="Chọn các channel cần xóa khỏi monitor (private với bạn), sau đó bấm **Delete** hoặc **Cancel**.", color=0xE74C3C, timestamp=datetime.now(timezone.utc))
+        embed = discord.Embed(title="🗑️ Xóa monitor", description="Chọn các channel cần xóa khỏi monitor (private với bạn), sau đó bấm **Delete** hoặc **Cancel**.\n**📦 Hàng loạt**: xóa theo category / mẫu tên (không giới hạn 25).", color=0xE74C3C, timestamp=datetime.now(timezone.utc))
         try:
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             try:
@@ -2056,7 +4091,7 @@ class ConfigView(discord.ui.View):
                 await interaction.followup.send("UI chính vẫn ở kênh gốc; nếu muốn tắt giao diện cho bạn, hãy đóng cửa sổ ephemeral.", ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
             else:
                 await interaction.response.edit_message(content="UI chính vẫn ở kênh gốc; nếu muốn tắt giao diện cho bạn, hãy đóng cửa sổ ephemeral.", embed=None, view=None)
-            asyncio.create_task(_delete_original_after(interaction, UI_TEMP_DELETE_SECONDS))
+            _delete_original_after(interaction, UI_TEMP_DELETE_SECONDS)
         except Exception:
             try:
                 await interaction.response.send_message("UI chính vẫn ở kênh gốc; nếu muốn tắt giao diện cho bạn, hãy đóng cửa sổ ephemeral.", ephemeral=True, delete_after=UI_TEMP_DELETE_SECONDS)
@@ -2067,7 +4102,7 @@ class ConfigView(discord.ui.View):
 # ---------------- Post UI (public) ----------------
 async def post_ui_to_channel(channel_id: int, *, guild: discord.Guild = None):
     try:
-        ch = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+        ch = await resolve_channel(channel_id)
     except Exception as e:
         print(f"Cannot access channel {channel_id} to post UI: {e}")
         return False
@@ -2095,23 +4130,25 @@ async def post_ui_to_channel(channel_id: int, *, guild: discord.Guild = None):
 # ---------------- on_ready & monitoring loop ----------------
 @bot.event
 async def on_ready():
-    global next_check_time, timer_task
+    """
+    Runs the full initialization once. discord.py dispatches on_ready again after every new gateway
+    session; those only reconcile channels that changed while disconnected (see reconcile_activity).
+    """
+    global timer_task, deletion_task, ready_initialized
+    if ready_initialized:
+        print(f"Reconnected: {bot.user} (new session)")
+        reconcile_activity("reconnect")
+        return
+    ready_initialized = True
     print(f"Bot ready: {bot.user} (id: {bot.user.id})")
-    load_config()
-    load_monitored()
+    # state was loaded by __main__ before bot.run(); reloading here would drop the last_message_ts updates
+    # on_message made before READY while activity_known still vouches for them
+    begin_startup_tracking()
+    if deletion_task is None or deletion_task.done():
+        deletion_task = asyncio.create_task(deletion_scheduler.run())
 
-    # init last_message_time for monitored if missing
-    for cid in list(monitored.keys()):
-        try:
-            ch = bot.get_channel(cid) or await bot.fetch_channel(cid)
-            msgs = [m async for m in ch.history(limit=1)]
-            if msgs:
-                monitored[cid]["last_message_time"] = msgs[0].created_at.replace(tzinfo=timezone.utc)
-            else:
-                monitored[cid]["last_message_time"] = datetime.now(timezone.utc)
-        except Exception as e:
-            print(f"Init: cannot access channel {cid}: {e}")
-            monitored[cid]["last_message_time"] = datetime.now(timezone.utc)
+    if not FAST_STARTUP:
+        await init_monitor_activity()
 
     # Register persistent views
     try:
@@ -2126,23 +4163,73 @@ async def on_ready():
         bot.add_view(RemainingView())
     except Exception:
         pass
+    try:
+        bot.add_view(DigestConfirmView())
+    except Exception:
+        pass
 
-    # Ensure remaining-message exists for configured guilds
-    for gid, ent in config.get("guilds", {}).items():
-        try:
-            gid_int = int(gid)
-            if ent.get("log_channel_id"):
-                try:
-                    await ensure_remaining_message_for_guild(gid_int)
-                except Exception as e:
-                    print(f"Error ensuring remaining message for guild {gid}: {e}")
-        except Exception:
-            continue
+    try:
+        bot.add_view(BulkJobView())
+    except Exception:
+        pass
+    bulk_jobs.resume()
 
+    if FAST_STARTUP:
+        # scanner first; countdown messages and command sync catch up in the background
+        start_scanner()
+        asyncio.create_task(startup_background())
+        return
+
+    await ensure_remaining_messages()
     # start the remaining-message updater background task if not running
     if timer_task is None or timer_task.done():
         timer_task = asyncio.create_task(update_remaining_messages_loop())
+    await sync_app_commands()
+    start_scanner()
+
+
+async def init_monitor_activity():
+    """Old sequential warm-up: fetch every monitored channel's last message before scanning starts."""
+    for cid in list(monitored.keys()):
+        try:
+            last_id = cached_last_message_id(cid)
+            if last_id:
+                monitored[cid].last_message_ts = snowflake_ts(last_id)
+                note_seen_message(cid, last_id)
+                activity_known.add(cid)
+                note_first_scan(cid)
+                continue
+            ch = await resolve_channel(cid)
+            msgs = [m async for m in ch.history(limit=1)]
+            if msgs:
+                monitored[cid].last_message_ts = snowflake_ts(msgs[0].id)
+                note_seen_message(cid, msgs[0].id)
+                activity_known.add(cid)
+            else:
+                monitored[cid].last_message_ts = int(time.time())
+        except Exception as e:
+            print(f"Init: cannot access channel {cid}: {e}")
+            monitored[cid].last_message_ts = int(time.time())
+        note_first_scan(cid)
+    for gid in guild_members:
+        touch_monitor_list(gid, state_only=True)
 
+
+async def ensure_remaining_messages():
+    """Ensure the remaining-message of every configured guild, WARMUP_CONCURRENCY guilds at a time."""
+    sem = asyncio.Semaphore(max(1, WARMUP_CONCURRENCY))
+
+    async def one(gid):
+        async with sem:
+            try:
+                await ensure_remaining_message_for_guild(int(gid))
+            except Exception as e:
+                print(f"Error ensuring remaining message for guild {gid}: {e}")
+
+    await asyncio.gather(*(one(gid) for gid, ent in list(config.get("guilds", {}).items()) if ent.get("log_channel_id")))
+
+
+async def sync_app_commands():
     try:
         if BOT_GUILD_ID:
             guild_obj = discord.Object(id=int(BOT_GUILD_ID))
@@ -2154,10 +4241,24 @@ async def on_ready():
     except Exception as e:
         print("Failed to sync app commands:", e)
 
-    # set next_check_time to now + interval so countdown begins immediately
-    next_check_time = datetime.now(timezone.utc) + timedelta(seconds=CHECK_INTERVAL_SECONDS)
 
-    # start the periodic scanner (uses configured interval)
+async def startup_background():
+    global timer_task
+    await ensure_remaining_messages()
+    # the updater starts only now, so it can't race the warm-up into creating duplicate countdown messages
+    if timer_task is None or timer_task.done():
+        timer_task = asyncio.create_task(update_remaining_messages_loop())
+    await sync_app_commands()
+
+
+def start_scanner():
+    """Start the scanner: deadline heap, or the periodic per-guild sweep (first sweep runs immediately)."""
+    global scheduler_task
+    if SCAN_MODE == "deadline":
+        rebuild_schedule()
+        if scheduler_task is None or scheduler_task.done():
+            scheduler_task = asyncio.create_task(deadline_scheduler.run())
+        return
     try:
         if not check_loop.is_running():
             check_loop.start()
@@ -2165,27 +4266,126 @@ async def on_ready():
         print("Failed to start check_loop:", e)
 
 
-@tasks.loop(seconds=CHECK_INTERVAL_SECONDS)
-async def check_loop():
+def begin_startup_tracking():
+    startup_stats["ready_at"] = time.perf_counter()
+    startup_stats["pending"] = set(monitor_guilds)
+    startup_stats["time_to_first_scan"] = None
+    if not startup_stats["pending"]:
+        startup_stats["time_to_first_scan"] = 0.0
+
+
+def note_first_scan(cid: int):
+    """Called after every channel evaluation (or legacy warm-up); records when every monitor was checked once since on_ready."""
+    pending = startup_stats["pending"]
+    if not pending:
+        return
+    pending.discard(cid)
+    if not pending and startup_stats["time_to_first_scan"] is None:
+        startup_stats["time_to_first_scan"] = time.perf_counter() - startup_stats["ready_at"]
+        print(f"Startup: every monitored channel checked {startup_stats['time_to_first_scan']:.2f}s after on_ready")
+
+
+@bot.listen("on_message")
+async def track_monitored_activity(message: discord.Message):
+    """
+    Gateway-driven activity tracking: keep monitored[cid].last_message_ts fresh in memory
+    so scans don't need a history() round-trip per channel.
+    """
+    if not EVENT_DRIVEN_TRACKING:
+        return
+    cid = message.channel.id
+    rec = monitored.get(cid)
+    if rec is None:
+        return
+    created = snowflake_ts(message.id)
+    last = rec.last_message_ts
+    note_seen_message(cid, message.id)
+    activity_known.add(cid)
+    if last and created <= last:
+        return
+    guild_id = message.guild.id if message.guild else None
+    try:
+        await reset_monitor_activity(cid, rec, created, guild_id)
+    except Exception as e:
+        print(f"Error tracking activity for {cid}: {e}")
+
+
+def note_seen_message(cid: int, message_id: int):
+    if message_id and message_id > (seen_message_ids.get(cid) or 0):
+        seen_message_ids[cid] = message_id
+
+
+def reconcile_activity(reason: str):
     """
-    Global periodic scanner. It sets next_check_time at the top of the run so the remaining-time updater can count down.
+    After a reconnect, compare every monitored channel's cached last_message_id with the newest message
+    our state reflects. Only channels that changed while we were away (or that aren't cached) lose their
+    "known" status and get one history() poll; everything else keeps its in-memory state. No REST calls.
     """
-    global next_check_time
-    # set next run time at start (so update loop sees correct remaining immediately)
-    next_check_time = datetime.now(timezone.utc) + timedelta(seconds=CHECK_INTERVAL_SECONDS)
+    if not EVENT_DRIVEN_TRACKING:
+        return
+    stale = 0
+    for cid, gid in monitor_guilds.items():
+        if cid not in activity_known:
+            continue
+        ch = bot.get_channel(cid)
+        if ch is not None and getattr(ch, "last_message_id", None) == seen_message_ids.get(cid):
+            continue
+        activity_known.discard(cid)
+        schedule_monitor(cid, gid)
+        stale += 1
+    print(f"Resync ({reason}): {stale} monitored channel(s) changed while disconnected")
+
 
-    # perform scan per guild
-    guilds = list(config.get("guilds", {}).keys())
-    for gid in guilds:
+@bot.listen("on_resumed")
+async def resync_after_resume():
+    # a resumed session replays missed events; this only catches what the replay didn't cover
+    reconcile_activity("resume")
+
+
+@tasks.loop(seconds=1)
+async def check_loop():
+    """
+    Periodic scanner (SCAN_MODE == "interval"). Every guild has its own timeline: a guild is swept when its
+    next check time is reached, then its next check is set one guild_scan_interval() ahead. Channels with
+    their own scan_interval override are left out of that sweep and kept on their own timeline
+    (channel_next_check). Guild sweeps run as independent tasks, so a slow guild never delays the others.
+    """
+    async def scan_guild(gid_int, cids):
         try:
-            gid_int = int(gid)
+            started = time.perf_counter()
             try:
                 guild = bot.get_guild(gid_int) or await bot.fetch_guild(gid_int)
             except Exception:
-                continue
-            await perform_scan_for_guild(guild)
+                return
+            await perform_scan_for_guild(guild, cids)
+            print(f"check_loop: guild {gid_int} swept in {time.perf_counter() - started:.2f}s")
         except Exception as e:
-            print(f"Error running scan for guild {gid}: {e}")
+            print(f"Error running scan for guild {gid_int}: {e}")
+        finally:
+            guild_scan_tasks.pop(gid_int, None)
+
+    now = datetime.now(timezone.utc)
+    for gid, ent in list(config.get("guilds", {}).items()):
+        gid_int = int(gid)
+        if gid_int in guild_scan_tasks:
+            continue
+        members = guild_monitored_list(gid_int)
+        # only the (few) overridden channels are walked every tick, not the whole guild
+        own = {int(c) for c, ov in (ent.get("channel_overrides") or {}).items()
+               if ov.get("scan_interval") and int(c) in members}
+        due = []
+        for cid in own:
+            nxt = channel_next_check.get(cid)
+            if nxt is None or nxt <= now:
+                channel_next_check[cid] = now + timedelta(seconds=monitor_scan_interval(cid, gid_int))
+                due.append(cid)
+        nxt = guild_next_check.get(gid_int)
+        if nxt is None or nxt <= now:
+            # set next run time at start (so update loop sees correct remaining immediately)
+            guild_next_check[gid_int] = now + timedelta(seconds=guild_scan_interval(gid_int))
+            due.extend(cid for cid in members if cid not in own)
+        if due:
+            guild_scan_tasks[gid_int] = asyncio.create_task(scan_guild(gid_int, due))
 
 
 # ---------------- Management commands (kept simple) ----------------
@@ -2217,7 +4417,8 @@ async def masscreate(ctx, base_name: str, count: int, chan_type: str = "text", s
         await ctx.reply(f"❌ Không thể tạo {count} channel — server hiện có {current_channels} channel; giới hạn ~500.", mention_author=False)
         return
     chan_type = (chan_type or "text").lower()
-    is_voice = chan_type.startswith("v")
+    monitor = "+monitor" in chan_type
+    chan_type = chan_type.replace("+monitor", "").strip() or "text"
     try:
         start = int(start)
     except:
@@ -2233,7 +4434,7 @@ async def masscreate(ctx, base_name: str, count: int, chan_type: str = "text", s
             await ctx.reply("❌ category không hợp lệ (hãy dùng <#id> hoặc id).", mention_author=False)
             return
         try:
-            cat = guild.get_channel(cid) or await bot.fetch_channel(cid)
+            cat = await resolve_channel(cid)
             if not isinstance(cat, discord.CategoryChannel):
                 await ctx.reply("❌ Channel được cung cấp không phải Category.", mention_author=False)
                 return
@@ -2241,47 +4442,122 @@ async def masscreate(ctx, base_name: str, count: int, chan_type: str = "text", s
         except Exception as e:
             await ctx.reply(f"❌ Không thể truy cập category: {e}", mention_author=False)
             return
-    if padding <= 0:
-        max_index = start + count - 1
-        padding = len(str(max_index))
-    created = []
-    failed = []
-    if base_name:
-        start_display = f"{base_name}-{start}"
+    # progress is reported by the job's status message in this channel
+    await do_masscreate(guild, ctx.channel, base_name, count, chan_type, start, padding, category_obj.id if category_obj else None, ctx.author, monitor=monitor)
+
+
+@bot.group(name="bulk", invoke_without_command=True)
+@commands.has_guild_permissions(manage_channels=True)
+async def bulk_group(ctx):
+    await ctx.reply("Commands: `!bulk delete <category> [pattern]`, `!bulk rename <category> <base_name> [start] [pattern]`, "
+                    "`!bulk move <category> <to_category> [pattern]`, `!bulk monitor <category|*> [pattern]`, "
+                    "`!bulk unmonitor <category|*> [pattern]`, `!bulk jobs`, `!bulk cancel <job_id>` "
+                    "(pattern: glob `base-0*`, regex `re:^base-\\d+$` hoặc khoảng `base-001..base-300`)", mention_author=False)
+
+
+async def _bulk_category(ctx, arg: str):
+    """Resolve a category argument (mention or id); replies and returns None when it isn't a category."""
+    cid = parse_channel_argument(arg)
+    cat = ctx.guild.get_channel(cid) if cid else None
+    if not isinstance(cat, discord.CategoryChannel):
+        await ctx.reply("❌ category không hợp lệ (hãy dùng <#id> hoặc id).", mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
+        return None
+    return cat
+
+
+async def _bulk_targets(ctx, category_id: int, pattern: str):
+    """bulk_targets() for a command; replies and returns None when the selector is invalid."""
+    try:
+        return bulk_targets(ctx.guild, category_id, pattern)
+    except ValueError as e:
+        await ctx.reply(f"❌ {e}", mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
+        return None
+
+
+async def _bulk_submit(ctx, op: str, items: list, params: dict = None):
+    if not items:
+        await ctx.reply("Không có channel nào khớp.", mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
+        return
+    await bulk_jobs.submit(ctx.guild, op, items, params or {}, ctx.author, ctx.channel)
+
+
+@bulk_group.command(name="delete")
+async def bulk_delete(ctx, category: str, pattern: str = None):
+    cat = await _bulk_category(ctx, category)
+    targets = await _bulk_targets(ctx, cat.id, pattern) if cat else None
+    if targets is not None:
+        await _bulk_submit(ctx, "delete", [c.id for c in targets])
+
+
+@bulk_group.command(name="rename")
+async def bulk_rename(ctx, category: str, base_name: str, start: int = 1, pattern: str = None):
+    cat = await _bulk_category(ctx, category)
+    targets = await _bulk_targets(ctx, cat.id, pattern) if cat else None
+    if targets is None:
+        return
+    padding = len(str(start + len(targets) - 1))
+    await _bulk_submit(ctx, "rename", [[c.id, f"{base_name}-{str(start + i).zfill(padding)}"] for i, c in enumerate(targets)])
+
+
+@bulk_group.command(name="move")
+async def bulk_move(ctx, category: str, to_category: str, pattern: str = None):
+    cat = await _bulk_category(ctx, category)
+    dest = await _bulk_category(ctx, to_category) if cat else None
+    targets = await _bulk_targets(ctx, cat.id, pattern) if dest else None
+    if targets is not None:
+        await _bulk_submit(ctx, "move", [c.id for c in targets], {"category_id": dest.id})
+
+
+async def _bulk_monitor_batch(ctx, category: str, pattern: str, add: bool):
+    """
+    !bulk monitor / unmonitor: no API calls involved, so applied at once (one locked batch, one save,
+    one reply) instead of as a queued job. category "*" = the whole server.
+    """
+    cat = None
+    if category != "*":
+        cat = await _bulk_category(ctx, category)
+        if not cat:
+            return
+    targets = await _bulk_targets(ctx, cat.id if cat else None, pattern)
+    if targets is None:
+        return
+    if add:
+        log_ids = (get_guild_log_channel(ctx.guild.id), get_guild_ui_channel(ctx.guild.id))
+        targets = [c for c in targets if c.id not in log_ids]
+    changed, skipped, preserved = await apply_monitor_batch(ctx.guild, targets, add=add)
+    if add:
+        text = f"✅ Đã thêm {len(changed)} monitor." if changed else "Không có channel mới nào khớp."
     else:
-        start_display = f"{start}"
-    await ctx.reply(f"⏳ Bắt đầu tạo {count} {'voice' if is_voice else 'text'} channel từ `{start_display}` ... (padding={padding})", mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
-    for i in range(start, start + count):
-        number_str = str(i).zfill(padding) if padding > 0 else str(i)
-        if base_name:
-            chan_name = f"{base_name}-{number_str}"
-        else:
-            chan_name = f"{number_str}"
-        try:
-            if is_voice:
-                ch = await guild.create_voice_channel(name=chan_name, category=category_obj, reason=f"masscreate by {ctx.author} ({ctx.author.id})")
-            else:
-                ch = await guild.create_text_channel(name=chan_name, category=category_obj, reason=f"masscreate by {ctx.author} ({ctx.author.id})")
-            created.append(ch)
-            await asyncio.sleep(0.6)
-        except discord.HTTPException:
-            try:
-                await asyncio.sleep(2)
-                if is_voice:
-                    ch = await guild.create_voice_channel(name=chan_name, category=category_obj, reason=f"retry masscreate by {ctx.author}")
-                else:
-                    ch = await guild.create_text_channel(name=chan_name, category=category_obj, reason=f"retry masscreate by {ctx.author}")
-                created.append(ch)
-            except Exception as e2:
-                failed.append((chan_name, str(e2)))
-                await asyncio.sleep(1)
-        except Exception as e:
-            failed.append((chan_name, str(e)))
-            await asyncio.sleep(0.5)
-    summary = f"✅ Hoàn thành. Tạo được {len(created)}/{count} channel."
-    if failed:
-        summary += f" Thất bại: {len(failed)}.\nCác lỗi mẫu: {failed[:5]}"
-    await ctx.reply(summary, mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
+        text = f"✅ Đã xóa {len(changed)} monitor." if changed else "Không có monitor nào khớp."
+    if skipped:
+        text += f" Bỏ qua {len(skipped)} channel " + ("đã được theo dõi." if add else "không được theo dõi.")
+    if preserved:
+        text += f" (giữ lại {len(preserved)} alert cũ trong log)"
+    await ctx.reply(text, mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
+
+
+@bulk_group.command(name="monitor")
+async def bulk_monitor(ctx, category: str, pattern: str = None):
+    await _bulk_monitor_batch(ctx, category, pattern, add=True)
+
+
+@bulk_group.command(name="unmonitor")
+async def bulk_unmonitor(ctx, category: str, pattern: str = None):
+    await _bulk_monitor_batch(ctx, category, pattern, add=False)
+
+
+@bulk_group.command(name="jobs")
+async def bulk_list(ctx):
+    jobs = bulk_jobs.guild_jobs(ctx.guild.id)
+    lines = [BulkJobQueue.status_text(jid, job, queued=i) for i, (jid, job) in enumerate(jobs)]
+    await ctx.reply("\n".join(lines) or "Không có job nào.", mention_author=False, delete_after=30)
+
+
+@bulk_group.command(name="cancel")
+async def bulk_cancel(ctx, job_id: str):
+    jobs = dict(bulk_jobs.guild_jobs(ctx.guild.id))
+    ok = job_id in jobs and bulk_jobs.cancel(job_id)
+    await ctx.reply(f"⛔ Đang huỷ job `{job_id}`." if ok else "❌ Không tìm thấy job.", mention_author=False, delete_after=UI_TEMP_DELETE_SECONDS)
 
 
 # ---------------- Slash commands: cmconfig, cmsetup (unchanged) & /st ----------------
@@ -2314,7 +4590,7 @@ async def cmsetup(interaction: discord.Interaction, channel: str):
         await interaction.response.send_message("❌ Đầu vào không hợp lệ. Dùng <#id> hoặc id.", ephemeral=True, delete_after=6)
         return
     try:
-        _ = bot.get_channel(cid) or await bot.fetch_channel(cid)
+        _ = await resolve_channel(cid)
     except Exception as e:
         await interaction.response.send_message(f"❌ Không thể truy cập channel: {e}", ephemeral=True, delete_after=6)
         return
@@ -2333,7 +4609,8 @@ async def st_command(interaction: discord.Interaction, seconds: int):
     Requires Manage Channels permission.
     Behavior:
     - Updates global scan interval and persists it.
-    - Resets countdown (next_check_time) so the next run occurs after the new interval.
+    - Resets the countdown of every guild so the next run occurs after the (new) interval.
+      Guilds with their own interval (/schedule) keep it.
     - Updates remaining-time messages immediately.
     - Runs an immediate scan and keeps schedule.
     """
@@ -2352,9 +4629,10 @@ async def st_command(interaction: discord.Interaction, seconds: int):
     # set global interval and persist (also changes running task interval)
     set_global_scan_interval(seconds)
 
-    # reset next_check_time and restart countdown
-    global next_check_time
-    next_check_time = datetime.now(timezone.utc) + timedelta(seconds=CHECK_INTERVAL_SECONDS)
+    # reset every guild's timeline and restart countdown
+    now = datetime.now(timezone.utc)
+    for gid in config.get("guilds", {}):
+        guild_next_check[int(gid)] = now + timedelta(seconds=guild_scan_interval(int(gid)))
 
     # update remaining messages immediately (best-effort)
     for gid, ent in config.get("guilds", {}).items():
@@ -2378,11 +4656,73 @@ async def st_command(interaction: discord.Interaction, seconds: int):
     await interaction.response.send_message(f"✅ Đã đặt thời gian quét: {CHECK_INTERVAL_SECONDS}s và đặt lại đếm ngược; quét ngay lập tức.", ephemeral=True, delete_after=6)
 
 
+@bot.tree.command(name="schedule", description="/schedule [interval] [threshold] [channel] — per-guild or per-channel scan schedule (0 = default)")
+async def schedule_command(interaction: discord.Interaction, interval: int = None, threshold: int = None, channel: str = None):
+    """
+    Sets this guild's own scan interval / alert threshold (seconds), or with `channel` the override of one
+    monitored channel. 0 removes the override (back to the guild / global default). Without values it shows
+    the current schedule.
+    """
+    if not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
+        await interaction.response.send_message("Bạn cần quyền Manage Channels để sử dụng lệnh này.", ephemeral=True, delete_after=6)
+        return
+    if (interval is not None and interval < 0) or (threshold is not None and threshold < 0):
+        await interaction.response.send_message("Giá trị phải >= 0 (0 = dùng mặc định).", ephemeral=True, delete_after=6)
+        return
+    gid = interaction.guild.id
+    if channel:
+        cid = parse_channel_argument(channel)
+        if cid is None or cid not in guild_monitored_list(gid):
+            await interaction.response.send_message("❌ Channel không hợp lệ hoặc chưa được theo dõi.", ephemeral=True, delete_after=6)
+            return
+        if interval is not None or threshold is not None:
+            set_channel_schedule(gid, cid, interval, threshold)
+        msg = (f"<#{cid}>: quét {monitor_scan_interval(cid, gid)}s • ngưỡng {monitor_threshold(cid, gid)}s"
+               f" (guild: {guild_scan_interval(gid)}s / {guild_threshold(gid)}s)")
+    else:
+        if interval is not None or threshold is not None:
+            set_guild_schedule(gid, interval, threshold)
+            try:
+                await ensure_remaining_message_for_guild(gid)
+            except Exception:
+                pass
+        ent = ensure_guild_entry(gid)
+        msg = (f"Guild: quét {guild_scan_interval(gid)}s • ngưỡng {guild_threshold(gid)}s"
+               f" (mặc định: {CHECK_INTERVAL_SECONDS}s / {THRESHOLD_SECONDS}s)")
+        if ent.get("channel_overrides"):
+            msg += f"\nChannel riêng: {len(ent['channel_overrides'])}"
+    await interaction.response.send_message(f"✅ {msg}", ephemeral=True, delete_after=10)
+
+
+@bot.tree.command(name="perf", description="Show scan / API performance counters")
+async def perf_command(interaction: discord.Interaction):
+    if not (interaction.user.guild_permissions.manage_channels or interaction.user.guild_permissions.administrator):
+        await interaction.response.send_message("Bạn cần quyền Manage Channels để sử dụng lệnh này.", ephemeral=True, delete_after=6)
+        return
+    embed = discord.Embed(title="📈 Performance", color=0x3498DB, timestamp=datetime.now(timezone.utc))
+    st = scan_stats.get(interaction.guild.id) if interaction.guild else None
+    if st:
+        embed.add_field(name="Last scan", value=f"{st['channels']} channel • {st['duration']:.2f}s • {local_time_str(st['finished_at'])}", inline=False)
+    counters = "\n".join(f"{k}: {v}" for k, v in perf_counters.items())
+    embed.add_field(name="Counters", value=counters or "—", inline=False)
+    embed.add_field(name="Persistence", value=f"writes: {persistence.writes} • backend: {STORAGE_BACKEND}", inline=False)
+    if startup_stats["time_to_first_scan"] is not None:
+        embed.add_field(name="Startup", value=f"time to first scan: {startup_stats['time_to_first_scan']:.2f}s", inline=False)
+    embed.add_field(name="Alerts", value=f"single: {alert_dispatcher.sent_single} • digests: {alert_dispatcher.sent_digest} • edited: {alert_dispatcher.edited}", inline=False)
+    embed.add_field(name="Deletions", value=f"pending: {len(deletion_scheduler)} • done: {deletion_scheduler.deleted}", inline=False)
+    embed.add_field(name="Rate limits", value=f"429s: {rate_limits.hits_429}", inline=False)
+    rates = " • ".join(f"{op}: {bulk_jobs.rate(op):.2f}/s" for op in bulk_jobs.totals) or "—"
+    embed.add_field(name="Bulk jobs", value=f"queued: {len(bulk_jobs.jobs())} • {rates}", inline=False)
+    await interaction.response.send_message(embed=embed, ephemeral=True, delete_after=30)
+
+
 # ---------------- Run ----------------
 if __name__ == "__main__":
     load_config()
     load_monitored()
+    load_pending_deletions()
     if not TOKEN:
         print("ERROR: BOT TOKEN chưa cấu hình. Set DISCORD_TOKEN environment variable.")
     else:
         bot.run(TOKEN)
+        persistence.flush_sync()
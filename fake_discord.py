@@ -0,0 +1,295 @@
+# file: fake_discord.py
+"""
+In-process stand-in for the Discord HTTP API (and the few gateway events the bot listens to),
+so bot.py can be exercised and measured offline — see bench.py.
+
+It replaces `client.http.request` with a router over an in-memory store of guilds, channels and
+messages. Responses are real Discord payloads, so discord.py builds its normal objects from them.
+Latency and 429s are simulated the way discord.py would experience them (the request waits out
+`retry_after`, then succeeds), and every call is counted per route.
+"""
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import discord
+from discord.http import Route
+
+CHANNEL_TEXT = 0
+CHANNEL_VOICE = 2
+CHANNEL_CATEGORY = 4
+
+
+class FakeResponse:
+    """Just enough of aiohttp.ClientResponse for discord.HTTPException."""
+
+    def __init__(self, status: int, reason: str, headers: dict = None):
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+
+class FakeDiscord:
+    def __init__(self, client: discord.Client, *, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_every: int = 0, bucket_limit: tuple = None, retry_after: float = 0.05,
+                 gateway: bool = True, seed: int = 1):
+        """
+        latency / jitter     seconds added to every request (uniform jitter on top)
+        rate_limit_every     inject a 429 on every Nth request (0 = never)
+        bucket_limit         (requests, per_seconds) enforced per route bucket + major parameter, e.g. (5, 5.0)
+        retry_after          retry_after of injected 429s
+        gateway              emit MESSAGE_CREATE / MESSAGE_DELETE / CHANNEL_CREATE like the real gateway would
+        """
+        self.client = client
+        self.state = client._connection
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.bucket_limit = bucket_limit
+        self.retry_after = retry_after
+        self.gateway = gateway
+        self.rng = random.Random(seed)
+
+        self.guilds = {}       # guild_id -> guild payload
+        self.channels = {}     # channel_id -> channel payload
+        self.messages = {}     # channel_id -> {message_id: payload}
+        self.calls = Counter()          # "METHOD /path/template" -> count
+        self.rate_limited = 0
+        self.sent_log = []              # (epoch time, channel_id, payload) for every message the bot created
+        self._seq = itertools.count(1)
+        self._windows = {}              # bucket key -> (window_start, used)
+        self.user = {"id": str(self.snowflake()), "username": "monitor-bot", "discriminator": "0000",
+                     "avatar": None, "bot": True}
+        self.human = {"id": str(self.snowflake()), "username": "player", "discriminator": "0001",
+                      "avatar": None}
+
+    # ---------------- setup ----------------
+    def install(self):
+        """Route the client's HTTP calls here. Call from inside the running event loop (as Client.login would)."""
+        loop = asyncio.get_running_loop()
+        self.client.loop = loop
+        self.client.http.loop = loop
+        self.state.loop = loop
+        self.state.user = discord.ClientUser(state=self.state, data=self.user)
+        self.client.http.request = self.request
+        return self
+
+    def snowflake(self, dt: datetime = None):
+        dt = dt or datetime.now(timezone.utc)
+        return discord.utils.time_snowflake(dt) + (next(self._seq) % 4096)
+
+    def add_guild(self, n_channels: int, *, name_fmt: str = "base-{:03d}", category: bool = True,
+                  log_channel: bool = True):
+        """Create a guild with n_channels text channels (+ optional category and log channel) in the gateway cache."""
+        gid = self.snowflake()
+        channels = []
+        parent_id = None
+        if category:
+            parent_id = self.snowflake()
+            channels.append(self._channel_payload(parent_id, gid, "missions", CHANNEL_CATEGORY))
+        for i in range(1, n_channels + 1):
+            channels.append(self._channel_payload(self.snowflake(), gid, name_fmt.format(i), CHANNEL_TEXT, parent_id))
+        if log_channel:
+            channels.append(self._channel_payload(self.snowflake(), gid, "monitor-log", CHANNEL_TEXT))
+        data = {
+            "id": str(gid), "name": f"bench-{gid}", "owner_id": self.human["id"], "features": [],
+            "roles": [{"id": str(gid), "name": "@everyone", "permissions": "8", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "emojis": [], "stickers": [], "members": [], "channels": channels, "threads": [],
+            "member_count": 1, "large": False, "unavailable": False,
+        }
+        self.guilds[gid] = data
+        for ch in channels:
+            self.channels[int(ch["id"])] = ch
+            self.messages.setdefault(int(ch["id"]), {})
+        self.state._add_guild_from_data(data)
+        text = [int(c["id"]) for c in channels if c["type"] == CHANNEL_TEXT and c["name"] != "monitor-log"]
+        log_id = next((int(c["id"]) for c in channels if c["name"] == "monitor-log"), None)
+        return gid, text, log_id
+
+    def _channel_payload(self, cid, gid, name, ctype, parent_id=None):
+        data = {"id": str(cid), "guild_id": str(gid), "name": name, "type": ctype, "position": 0,
+                "permission_overwrites": [], "parent_id": str(parent_id) if parent_id else None}
+        if ctype == CHANNEL_TEXT:
+            data.update({"topic": None, "nsfw": False, "last_message_id": None, "rate_limit_per_user": 0})
+        elif ctype == CHANNEL_VOICE:
+            data.update({"bitrate": 64000, "user_limit": 0, "rtc_region": None, "last_message_id": None})
+        return data
+
+    def _message_payload(self, cid, *, author=None, content="", embeds=None, components=None, at=None):
+        ch = self.channels[cid]
+        mid = self.snowflake(at)
+        ts = (at or datetime.now(timezone.utc)).isoformat()
+        return {
+            "id": str(mid), "channel_id": str(cid), "guild_id": ch.get("guild_id"), "author": author or self.human,
+            "content": content or "", "timestamp": ts, "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": embeds or [], "components": components or [], "pinned": False, "type": 0,
+        }
+
+    def post_message(self, channel_id: int, *, at: datetime = None, content: str = "mission update", dispatch: bool = True):
+        """A user posts in a channel (stored; delivered to the bot as MESSAGE_CREATE when dispatch=True)."""
+        data = self._message_payload(channel_id, content=content, at=at)
+        self._store_message(channel_id, data, dispatch=dispatch)
+        return int(data["id"])
+
+    def _store_message(self, cid, data, *, dispatch=True):
+        self.messages.setdefault(cid, {})[int(data["id"])] = data
+        ch = self.channels.get(cid)
+        if ch is not None and "last_message_id" in ch:
+            ch["last_message_id"] = data["id"]
+        if self.gateway and dispatch:
+            self.state.parse_message_create(dict(data))
+
+    # ---------------- accounting ----------------
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.rate_limited = 0
+        self.sent_log.clear()
+
+    async def _throttle(self, route: Route):
+        n = self.total_calls()
+        if self.rate_limit_every and n % self.rate_limit_every == 0:
+            self.rate_limited += 1
+            await asyncio.sleep(self.retry_after)
+        if self.bucket_limit:
+            limit, per = self.bucket_limit
+            key = f"{route.key}:{route.major_parameters}"
+            now = time.monotonic()
+            start, used = self._windows.get(key, (now, 0))
+            if now - start >= per:
+                start, used = now, 0
+            if used >= limit:
+                self.rate_limited += 1
+                await asyncio.sleep(per - (now - start))
+                start, used = time.monotonic(), 0
+            self._windows[key] = (start, used + 1)
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+
+    def _error(self, status, reason, code, message):
+        exc = {404: discord.NotFound, 403: discord.Forbidden}.get(status, discord.HTTPException)
+        return exc(FakeResponse(status, reason), {"code": code, "message": message})
+
+    # ---------------- HTTP router ----------------
+    async def request(self, route: Route, *, files=None, form=None, **kwargs):
+        self.calls[f"{route.method} {route.path}"] += 1
+        await self._throttle(route)
+        parts = route.url[len(Route.BASE):].strip("/").split("/")
+        handler = getattr(self, "_" + route.method.lower() + "_" + "_".join(
+            p if not p.isdigit() else "id" for p in parts).replace("-", "_"), None)
+        if handler is None:
+            raise self._error(405, "Method Not Allowed", 0, f"fake_discord: unsupported route {route.method} {route.path}")
+        ids = [int(p) for p in parts if p.isdigit()]
+        return handler(*ids, json=kwargs.get("json"), params=kwargs.get("params") or {})
+
+    def _channel(self, cid):
+        ch = self.channels.get(cid)
+        if ch is None:
+            raise self._error(404, "Not Found", 10003, "Unknown Channel")
+        return ch
+
+    def _message(self, cid, mid):
+        msg = self.messages.get(cid, {}).get(mid)
+        if msg is None:
+            raise self._error(404, "Not Found", 10008, "Unknown Message")
+        return msg
+
+    def _get_channels_id(self, cid, **_):
+        return dict(self._channel(cid))
+
+    def _get_guilds_id(self, gid, **_):
+        g = self.guilds.get(gid)
+        if g is None:
+            raise self._error(404, "Not Found", 10004, "Unknown Guild")
+        return {k: v for k, v in g.items() if k not in ("channels", "members", "threads")}
+
+    def _get_channels_id_messages(self, cid, params, **_):
+        self._channel(cid)
+        limit = int(params.get("limit", 50))
+        before = int(params["before"]) if params.get("before") else None
+        after = int(params["after"]) if params.get("after") else None
+        ids = sorted(self.messages.get(cid, {}), reverse=True)
+        if before is not None:
+            ids = [i for i in ids if i < before]
+        if after is not None:
+            ids = sorted(i for i in ids if i > after)
+        return [self.messages[cid][i] for i in ids[:limit]]
+
+    def _get_channels_id_messages_id(self, cid, mid, **_):
+        self._channel(cid)
+        return self._message(cid, mid)
+
+    def _post_channels_id_messages(self, cid, json, **_):
+        self._channel(cid)
+        json = json or {}
+        data = self._message_payload(cid, author=self.user, content=json.get("content") or "",
+                                     embeds=json.get("embeds"), components=json.get("components"))
+        self.sent_log.append((time.time(), cid, data))
+        self._store_message(cid, data)
+        return data
+
+    def _patch_channels_id_messages_id(self, cid, mid, json, **_):
+        msg = self._message(cid, mid)
+        json = json or {}
+        for key in ("content", "embeds", "components"):
+            if key in json:
+                msg[key] = json[key] if json[key] is not None else ([] if key != "content" else "")
+        msg["edited_timestamp"] = datetime.now(timezone.utc).isoformat()
+        return msg
+
+    def _delete_channels_id_messages_id(self, cid, mid, **_):
+        self._message(cid, mid)
+        self.messages[cid].pop(mid, None)
+        if self.gateway:
+            self.state.parse_message_delete({"id": str(mid), "channel_id": str(cid),
+                                             "guild_id": self.channels[cid].get("guild_id")})
+        return None
+
+    def _post_channels_id_messages_bulk_delete(self, cid, json, **_):
+        self._channel(cid)
+        ids = [int(i) for i in (json or {}).get("messages", [])]
+        if not 2 <= len(ids) <= 100:
+            raise self._error(400, "Bad Request", 50016, "bulk delete needs 2..100 messages")
+        for mid in ids:
+            self.messages[cid].pop(mid, None)
+        if self.gateway:
+            self.state.parse_message_delete_bulk({"ids": [str(i) for i in ids], "channel_id": str(cid),
+                                                  "guild_id": self.channels[cid].get("guild_id")})
+        return None
+
+    def _post_guilds_id_channels(self, gid, json, **_):
+        if gid not in self.guilds:
+            raise self._error(404, "Not Found", 10004, "Unknown Guild")
+        json = json or {}
+        data = self._channel_payload(self.snowflake(), gid, json.get("name", "channel"), int(json.get("type", 0)),
+                                     json.get("parent_id"))
+        self.channels[int(data["id"])] = data
+        self.messages[int(data["id"])] = {}
+        if self.gateway:
+            self.state.parse_channel_create(dict(data))
+        return data
+
+    def _patch_channels_id(self, cid, json, **_):
+        ch = self._channel(cid)
+        before = dict(ch)
+        for key in ("name", "parent_id", "position", "topic"):
+            if key in (json or {}):
+                ch[key] = json[key]
+        if self.gateway and before != ch:
+            self.state.parse_channel_update(dict(ch))
+        return dict(ch)
+
+    def _delete_channels_id(self, cid, **_):
+        ch = self._channel(cid)
+        self.channels.pop(cid, None)
+        self.messages.pop(cid, None)
+        if self.gateway:
+            self.state.parse_channel_delete(dict(ch))
+        return dict(ch)